@@ -0,0 +1,198 @@
+import copy
+from collections import Counter
+from types import SimpleNamespace
+from pymongo.errors import OperationFailure
+
+
+def _get(doc, path):
+    value = doc
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None, False
+        value = value[part]
+    return value, True
+
+
+def _compare(op, value, present, arg):
+    if op == "$in":
+        return value in arg
+    if op == "$nin":
+        return value not in arg
+    if op == "$ne":
+        return value != arg
+    if op == "$exists":
+        return present == bool(arg)
+    if value is None:
+        return False
+    if op == "$lt":
+        return value < arg
+    if op == "$lte":
+        return value <= arg
+    if op == "$gt":
+        return value > arg
+    if op == "$gte":
+        return value >= arg
+    raise NotImplementedError(f"Unsupported query operator {op}")
+
+
+def matches(doc, query):
+    """Evaluate the subset of the Mongo query language the service uses"""
+    for key, cond in query.items():
+        if key == "$or":
+            if not any(matches(doc, sub) for sub in cond):
+                return False
+            continue
+        if key == "$and":
+            if not all(matches(doc, sub) for sub in cond):
+                return False
+            continue
+        value, present = _get(doc, key)
+        if isinstance(cond, dict) and cond and all(k.startswith("$") for k in cond):
+            if not all(_compare(op, value, present, arg) for op, arg in cond.items()):
+                return False
+        elif cond is None:
+            if present and value is not None:
+                return False
+        elif value != cond:
+            return False
+    return True
+
+
+def _project(doc, projection):
+    if not projection:
+        return copy.deepcopy(doc)
+    out = {"_id": doc["_id"]}
+    for key, include in projection.items():
+        if include and key in doc:
+            out[key] = copy.deepcopy(doc[key])
+    return out
+
+
+def _apply_update(doc, update):
+    for key, value in update.get("$set", {}).items():
+        doc[key] = copy.deepcopy(value)
+    for key in update.get("$unset", {}):
+        doc.pop(key, None)
+
+
+class FakeCursor:
+    def __init__(self, docs, projection):
+        self._docs = docs
+        self._projection = projection
+        self._limit = 0
+        self._sort = None
+
+    def sort(self, key, direction=1):
+        self._sort = (key, direction)
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    def _results(self):
+        docs = list(self._docs)
+        if self._sort:
+            key, direction = self._sort
+            # Missing and null values sort lowest, as in Mongo
+            docs.sort(key=lambda d: (_get(d, key)[0] is not None, _get(d, key)[0] or 0), reverse=direction < 0)
+        if self._limit:
+            docs = docs[:self._limit]
+        return [_project(d, self._projection) for d in docs]
+
+    def __aiter__(self):
+        self._iter = iter(self._results())
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeCollection:
+    """In-memory stand-in for the Motor rawJobs collection that counts every op"""
+
+    def __init__(self, name):
+        self.name = name
+        self.docs = {}
+        self.ops = Counter()
+
+    def _matching(self, query):
+        return [doc for doc in self.docs.values() if matches(doc, query)]
+
+    async def insert_many(self, docs):
+        self.ops["insert_many"] += 1
+        for doc in docs:
+            self.docs[doc["_id"]] = copy.deepcopy(doc)
+
+    def find(self, query=None, projection=None):
+        self.ops["find"] += 1
+        return FakeCursor(self._matching(query or {}), projection)
+
+    async def find_one(self, query=None, projection=None):
+        self.ops["find_one"] += 1
+        found = self._matching(query or {})
+        return _project(found[0], projection) if found else None
+
+    async def update_one(self, query, update, upsert=False):
+        self.ops["update_one"] += 1
+        found = self._matching(query)[:1]
+        if not found and upsert:
+            doc = {k: v for k, v in query.items() if not k.startswith("$")}
+            self.docs[doc["_id"]] = doc
+            found = [doc]
+        for doc in found:
+            _apply_update(doc, update)
+        return SimpleNamespace(matched_count=len(found), modified_count=len(found))
+
+    def watch(self, pipeline=None, **kwargs):
+        # Like a standalone server, so callers fall back to polling
+        raise OperationFailure("The $changeStream stage is only supported on replica sets", code=40573)
+
+    async def update_many(self, query, update):
+        self.ops["update_many"] += 1
+        found = self._matching(query)
+        for doc in found:
+            _apply_update(doc, update)
+        return SimpleNamespace(matched_count=len(found), modified_count=len(found))
+
+    async def bulk_write(self, requests, ordered=True):
+        self.ops["bulk_write"] += 1
+        for request in requests:
+            # pymongo write models keep their arguments on private attributes
+            for doc in self._matching(request._filter)[:1]:
+                _apply_update(doc, request._doc)
+        return SimpleNamespace(matched_count=len(requests), modified_count=len(requests))
+
+    async def count_documents(self, query):
+        self.ops["count_documents"] += 1
+        return len(self._matching(query))
+
+    async def estimated_document_count(self):
+        self.ops["estimated_document_count"] += 1
+        return len(self.docs)
+
+    async def create_index(self, keys, **kwargs):
+        self.ops["create_index"] += 1
+        return kwargs.get("name", "")
+
+
+class FakeDatabase:
+    def __init__(self):
+        self._collections = {}
+
+    def __getitem__(self, name):
+        if name not in self._collections:
+            self._collections[name] = FakeCollection(name)
+        return self._collections[name]
+
+    def ops(self) -> Counter:
+        total = Counter()
+        for coll in self._collections.values():
+            total.update(coll.ops)
+        return total
@@ -0,0 +1,135 @@
+import json
+import asyncio
+from collections import Counter
+from urllib.parse import quote
+from aiohttp import web
+
+API_PATH = "/jobs-guest/jobs/api/jobPosting"
+JOB_PATH = "/jobs/view"
+CREATE_PATH = "/mature-jobs/create"
+CREATE_BULK_PATH = "/mature-jobs/create-bulk"
+
+# Job kinds and how many of every 20 seeded jobs use each
+JOB_MIX = [
+    ("easy_api", 8),        # API answers EASY_APPLY
+    ("throttled_api", 1),   # API answers 429 once, then EASY_APPLY
+    ("easy_page", 3),       # API has no answer, page has the onsite button
+    ("offsite_inline", 3),  # Page markup carries an externalApply link
+    ("offsite_modal", 3),   # Link only appears in the modal after a click
+    ("missing_button", 1),  # Closed posting without an apply button
+    ("slow_page", 1),       # Page responds after SLOW_PAGE_SECONDS
+]
+SLOW_PAGE_SECONDS = 2.0
+
+ONSITE_BUTTON = '<button data-tracking-control-name="public_jobs_apply-link-onsite">Easy Apply</button>'
+OFFSITE_BUTTON = (
+    '<button data-tracking-control-name="public_jobs_apply-link-offsite_sign-up-modal" '
+    'onclick="openModal()">Apply</button>'
+)
+
+
+def job_kind(index: int) -> str:
+    slot = index % sum(weight for _, weight in JOB_MIX)
+    for kind, weight in JOB_MIX:
+        if slot < weight:
+            return kind
+        slot -= weight
+    return JOB_MIX[0][0]
+
+
+def external_apply_url(job_id: str) -> str:
+    target = quote(f"https://careers.example.com/jobs/{job_id}", safe="")
+    return f"https://www.linkedin.com/jobs/view/externalApply/{job_id}?url={target}&amp;urlHash=bench"
+
+
+def _page(body: str, script: str = "") -> str:
+    return f"<!DOCTYPE html><html><head><title>Job</title></head><body>{body}<script>{script}</script></body></html>"
+
+
+def render_job_page(kind: str, job_id: str) -> str:
+    if kind in ("easy_page", "slow_page", "easy_api", "throttled_api"):
+        return _page(ONSITE_BUTTON)
+    if kind == "offsite_inline":
+        return _page(f'{OFFSITE_BUTTON}<a class="apply-link" href="{external_apply_url(job_id)}">Apply on company site</a>')
+    if kind == "offsite_modal":
+        # The modal is built client-side, so only the browser can read it
+        script = f'''
+            function openModal() {{
+                setTimeout(() => {{
+                    const dialog = document.createElement('div');
+                    dialog.setAttribute('role', 'dialog');
+                    dialog.innerHTML = '<div class="sign-up-modal__direct-apply-on-company-site">'
+                        + '<a class="sign-up-modal__company_webiste" href="https://careers.example.com/jobs/{job_id}">'
+                        + 'Apply on company website</a></div>';
+                    document.body.appendChild(dialog);
+                }}, 150);
+            }}
+        '''
+        return _page(OFFSITE_BUTTON, script)
+    return _page("<p>No longer accepting applications</p>")
+
+
+class FixtureServer:
+    """Local stand-in for LinkedIn (API and job pages) and the CREATE_API service"""
+
+    def __init__(self, kinds: dict, bulk: bool = True):
+        # LinkedIn job id -> kind
+        self.kinds = kinds
+        self.bulk = bulk
+        self.requests = Counter()
+        self.created = 0
+        self._throttled = set()
+        self._runner = None
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get(f"{API_PATH}/{{job_id}}", self.api)
+        app.router.add_get(f"{JOB_PATH}/{{slug}}", self.job_page)
+        app.router.add_post(CREATE_PATH, self.create)
+        app.router.add_post(CREATE_BULK_PATH, self.create_bulk)
+        return app
+
+    async def api(self, request):
+        self.requests["api"] += 1
+        job_id = request.match_info["job_id"]
+        kind = self.kinds.get(job_id)
+        if kind == "throttled_api" and job_id not in self._throttled:
+            self._throttled.add(job_id)
+            self.requests["api_429"] += 1
+            return web.Response(status=429, headers={"Retry-After": "1"})
+        if kind in ("easy_api", "throttled_api"):
+            return web.Response(text=json.dumps({"applyMethod": {"type": "EASY_APPLY"}}))
+        return web.Response(status=404)
+
+    async def job_page(self, request):
+        self.requests["page"] += 1
+        job_id = request.match_info["slug"].split("-")[-1]
+        kind = self.kinds.get(job_id)
+        if kind is None:
+            return web.Response(status=404)
+        if kind == "slow_page":
+            await asyncio.sleep(SLOW_PAGE_SECONDS)
+        return web.Response(text=render_job_page(kind, job_id), content_type="text/html")
+
+    async def create(self, request):
+        self.requests["create"] += 1
+        await request.json()
+        self.created += 1
+        return web.json_response({"status": "success"}, status=201)
+
+    async def create_bulk(self, request):
+        self.requests["create_bulk"] += 1
+        if not self.bulk:
+            return web.Response(status=404)
+        payloads = await request.json()
+        self.created += len(payloads)
+        return web.json_response({"status": "success"}, status=201)
+
+    async def start(self, host: str, port: int):
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
@@ -0,0 +1,207 @@
+"""Offline throughput benchmark for the mature job pipeline.
+
+Runs the real run_pipeline/worker/JobChecker code against local stand-ins:
+an aiohttp server playing LinkedIn (job posting API and job pages) and
+CREATE_API, and an in-memory rawJobs collection. Needs Chromium installed
+for Playwright. Run from jobScraper/matureJob:
+
+    python -m benchmarks.run --jobs 500 --workers 5 --output bench.json
+
+Results are printed (and optionally written) as JSON so runs can be
+compared across commits.
+"""
+import os
+import json
+import time
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime, timedelta, timezone
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def configure_env(args, port: int, workdir: str):
+    """Point config at the local stand-ins; must run before config is imported"""
+    base = f"http://127.0.0.1:{port}"
+    from benchmarks.fixtures import API_PATH, CREATE_PATH, CREATE_BULK_PATH
+    os.environ.update({
+        "MONGODB_URI": "mongodb://127.0.0.1:1",
+        "DB_NAME": "benchmark",
+        "CREATE_API": f"{base}{CREATE_PATH}",
+        "CREATE_BULK_API": f"{base}{CREATE_BULK_PATH}" if args.bulk else "",
+        "LINKEDIN_JOB_POSTING_API": f"{base}{API_PATH}",
+        "LINKEDIN_API_RATE": str(args.api_rate),
+        "LINKEDIN_API_BURST": str(max(1, int(args.api_rate))),
+        "WORKER_COUNT": str(args.workers),
+        "QUEUE_MAX": str(args.queue_max),
+        "POLL_INTERVAL": "5",
+        "PROCESS_COUNT": "1",
+        "FLASK_APP_PORT": "0",
+        "FLASK_APP_HOST": "127.0.0.1",
+        "JOB_CACHE_PATH": os.path.join(workdir, "jobs.sqlite3"),
+        "ASSET_CACHE_DIR": os.path.join(workdir, "assets"),
+        "SINK_SPOOL_DIR": os.path.join(workdir, "spool"),
+    })
+    return base
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return ""
+
+
+async def sample_rss(peak: dict, stop: asyncio.Event, interval: float = 0.25):
+    """Track peak RSS of this process plus its children (Playwright driver, Chromium)"""
+    import psutil
+    me = psutil.Process()
+    while not stop.is_set():
+        total = me.memory_info().rss
+        for child in me.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                pass
+        peak["bytes"] = max(peak["bytes"], total)
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def benchmark(args) -> dict:
+    from bson import ObjectId
+    from benchmarks.fixtures import FixtureServer, JOB_PATH, job_kind
+    from benchmarks.fake_mongo import FakeDatabase
+    from config.config import RAW_COLL
+    from module.matureJob import service
+    from module.matureJob.progress import RunProgress
+    from services.job_checker import JobChecker
+
+    base = args.base_url
+    kinds = {}
+    docs = []
+    now = datetime.now(timezone.utc)
+    for i in range(args.jobs):
+        job_id = str(4000000000 + i)
+        kinds[job_id] = job_kind(i)
+        docs.append({
+            "_id": ObjectId(),
+            "position": "Software Engineer",
+            "company": f"Company {i % 50}",
+            "jobUrl": f"{base}{JOB_PATH}/software-engineer-{job_id}",
+            "isEasyApply": False,
+            "isMatureJob": False,
+            "linkPassed": False,
+            "createdAt": now - timedelta(minutes=i),
+        })
+
+    db = FakeDatabase()
+    raw_coll = db[RAW_COLL]
+    await raw_coll.insert_many(docs)
+    raw_coll.ops.clear()
+
+    server = FixtureServer(kinds, bulk=args.bulk)
+    await server.start("127.0.0.1", args.port)
+
+    # Time every classification without changing the code under test
+    latencies = []
+    check = JobChecker.check_job_application_type
+
+    async def timed_check(self, job_url):
+        started = time.perf_counter()
+        try:
+            return await check(self, job_url)
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    JobChecker.check_job_application_type = timed_check
+
+    peak = {"bytes": 0}
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample_rss(peak, stop))
+    progress = RunProgress()
+    started = time.perf_counter()
+    try:
+        await service.run_pipeline(progress, db=db)
+    finally:
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await sampler
+        JobChecker.check_job_application_type = check
+        await server.stop()
+
+    stored = list(raw_coll.docs.values())
+    return {
+        "commit": git_commit(),
+        "jobs": args.jobs,
+        "workers": args.workers,
+        "processed": progress.count,
+        "elapsedSeconds": round(elapsed, 3),
+        "jobsPerSecond": round(progress.count / elapsed, 3) if elapsed else 0.0,
+        "latencyMs": {
+            "p50": round(percentile(latencies, 50) * 1000, 1),
+            "p95": round(percentile(latencies, 95) * 1000, 1),
+            "p99": round(percentile(latencies, 99) * 1000, 1),
+        },
+        "peakRssMb": round(peak["bytes"] / 1024 / 1024, 1),
+        "mongoOps": {**raw_coll.ops, "total": sum(raw_coll.ops.values())},
+        "httpRequests": dict(server.requests),
+        "matureJobsCreated": server.created,
+        "classified": {
+            "mature": sum(1 for d in stored if d.get("isMatureJob")),
+            "easyApply": sum(1 for d in stored if d.get("isEasyApply")),
+            "retrying": sum(1 for d in stored if d.get("nextAttemptAt")),
+            "deadLetter": sum(1 for d in stored if d.get("isDeadLetter")),
+            "expired": sum(1 for d in stored if d.get("isExpired")),
+            "pending": sum(1 for d in stored if not (
+                d.get("isMatureJob") or d.get("isEasyApply") or d.get("isDeadLetter") or d.get("nextAttemptAt")
+                or d.get("isExpired")
+            )),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline mature job pipeline benchmark")
+    parser.add_argument("--jobs", type=int, default=200, help="rawJobs documents to seed")
+    parser.add_argument("--workers", type=int, default=5, help="WORKER_COUNT")
+    parser.add_argument("--queue-max", type=int, default=50, help="QUEUE_MAX")
+    parser.add_argument("--api-rate", type=float, default=1000, help="LINKEDIN_API_RATE for the fixture host")
+    parser.add_argument("--no-bulk", dest="bulk", action="store_false", help="Serve no CREATE_BULK_API route")
+    parser.add_argument("--output", help="Also write the JSON result to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show pipeline logs")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="matureJob-bench-")
+    args.port = free_port()
+    args.base_url = configure_env(args, args.port, workdir)
+    from services.logging_setup import configure_logging
+    configure_logging("INFO" if args.verbose else "WARNING")
+
+    result = asyncio.run(benchmark(args))
+    output = json.dumps(result, indent=2, sort_keys=True)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import os
+import json
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -7,15 +8,113 @@ load_dotenv()
 MONGODB_URI = os.getenv("MONGODB_URI", "")
 DB_NAME = os.getenv("DB_NAME", "")
 RAW_COLL = "rawJobs"
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+# How run progress counts pending jobs: exact, estimate or off
+PENDING_COUNT_MODE = os.getenv("PENDING_COUNT_MODE", "exact")
 CREATE_API = os.getenv("CREATE_API", "")
+# Optional endpoint accepting a JSON array of CREATE_API payloads
+CREATE_BULK_API = os.getenv("CREATE_BULK_API", "")
 
 # LinkedIn API URLs
 LINKEDIN_JOB_POSTING_API = os.getenv("LINKEDIN_JOB_POSTING_API", "")
 
 WORKER_COUNT = int(os.getenv("WORKER_COUNT", ""))
+# Pipeline processes, each with its own browser and WORKER_COUNT workers
+PROCESS_COUNT = int(os.getenv("PROCESS_COUNT", "1"))
 QUEUE_MAX = int(os.getenv("QUEUE_MAX", ""))
 POLL_INTERVAL = int(os.getenv("POLL_INTERVAL", ""))
 
+# Daemon mode: change stream resume state, and how often the full backlog is
+# swept for retries that came due and leases that expired
+DAEMON_STATE_COLL = os.getenv("DAEMON_STATE_COLL", "daemonState")
+DAEMON_SWEEP_INTERVAL = int(os.getenv("DAEMON_SWEEP_INTERVAL", "60"))
+
+# Active workers are adjusted at runtime (AIMD), starting from WORKER_COUNT
+CONCURRENCY_MIN = int(os.getenv("CONCURRENCY_MIN", "1"))
+CONCURRENCY_MAX = int(os.getenv("CONCURRENCY_MAX", str(WORKER_COUNT * 2)))
+CONCURRENCY_INTERVAL = float(os.getenv("CONCURRENCY_INTERVAL", "10"))
+CONCURRENCY_DECREASE = float(os.getenv("CONCURRENCY_DECREASE", "0.7"))
+CONCURRENCY_LATENCY_TARGET = float(os.getenv("CONCURRENCY_LATENCY_TARGET", "20"))
+CONCURRENCY_MAX_ERROR_RATE = float(os.getenv("CONCURRENCY_MAX_ERROR_RATE", "0.2"))
+CONCURRENCY_MAX_CPU = float(os.getenv("CONCURRENCY_MAX_CPU", "85"))
+CONCURRENCY_MAX_MEMORY = float(os.getenv("CONCURRENCY_MAX_MEMORY", "85"))
+
+# Seconds a claimed rawJobs document stays leased without renewal
+LEASE_SECONDS = int(os.getenv("LEASE_SECONDS", "300"))
+
+# Failed jobs are retried with exponential backoff, then dead-lettered
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "5"))
+RETRY_BASE_SECONDS = float(os.getenv("RETRY_BASE_SECONDS", "60"))
+RETRY_MAX_SECONDS = float(os.getenv("RETRY_MAX_SECONDS", str(6 * 3600)))
+
+# Browser page pool
+PAGE_POOL_SIZE = int(os.getenv("PAGE_POOL_SIZE", str(CONCURRENCY_MAX)))
+PAGE_POOL_MAX_USES = int(os.getenv("PAGE_POOL_MAX_USES", "50"))
+
+# Browser is restarted once its processes exceed this RSS or have served this many pages
+BROWSER_MAX_RSS_MB = int(os.getenv("BROWSER_MAX_RSS_MB", "1536"))
+BROWSER_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "2000"))
+BROWSER_CHECK_INTERVAL = int(os.getenv("BROWSER_CHECK_INTERVAL", "15"))
+BROWSER_DRAIN_TIMEOUT = int(os.getenv("BROWSER_DRAIN_TIMEOUT", "60"))
+
+# Pending jobs are claimed newest first (by createdAt). Optional weights
+# boost fields of a job, e.g. {"company": {"Acme": 2}}; a job with weight w
+# ranks as if it were w times younger. Pending jobs older than
+# JOB_MAX_AGE_DAYS are expired without a check (0 disables)
+JOB_PRIORITY_WEIGHTS = json.loads(os.getenv("JOB_PRIORITY_WEIGHTS", "") or "{}")
+JOB_PRIORITY_WINDOW = int(os.getenv("JOB_PRIORITY_WINDOW", "4"))
+JOB_MAX_AGE_DAYS = float(os.getenv("JOB_MAX_AGE_DAYS", "30"))
+
+# Job classification cache
+JOB_CACHE_SIZE = int(os.getenv("JOB_CACHE_SIZE", "10000"))
+JOB_CACHE_TTL = int(os.getenv("JOB_CACHE_TTL", str(7 * 24 * 3600)))
+JOB_CACHE_PATH = os.getenv("JOB_CACHE_PATH", "cache/jobs.sqlite3")
+
+# Browser page loads: versioned scripts matching ASSET_CACHE_PATTERN are served
+# from a content-addressed disk cache; telemetry hosts and request patterns
+# are aborted
+ASSET_CACHE_DIR = os.getenv("ASSET_CACHE_DIR", "cache/assets")
+ASSET_CACHE_TTL = int(os.getenv("ASSET_CACHE_TTL", str(7 * 24 * 3600)))
+ASSET_CACHE_PATTERN = os.getenv("ASSET_CACHE_PATTERN", r"^https://static(-exp\d+)?\.licdn\.com/.+\.js(\?.*)?$")
+ASSET_BLOCK_HOSTS = [host.strip() for host in os.getenv(
+    "ASSET_BLOCK_HOSTS",
+    "google-analytics.com,googletagmanager.com,doubleclick.net,px.ads.linkedin.com,snap.licdn.com,"
+    "bat.bing.com,connect.facebook.net,analytics.twitter.com,sb.scorecardresearch.com"
+).split(",") if host.strip()]
+ASSET_BLOCK_PATTERN = os.getenv("ASSET_BLOCK_PATTERN", r"/li/track|/tscp-serving/|/sensorCollect|/beacons?/|/collect\?")
+
+# Shared HTTP client
+HTTP_DNS_TTL = int(os.getenv("HTTP_DNS_TTL", "300"))
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_RETRY_AFTER_DEFAULT = float(os.getenv("HTTP_RETRY_AFTER_DEFAULT", "5"))
+LINKEDIN_API_RATE = float(os.getenv("LINKEDIN_API_RATE", "5"))
+LINKEDIN_API_BURST = int(os.getenv("LINKEDIN_API_BURST", "10"))
+
+# Buffered rawJobs flag updates
+BULK_WRITE_SIZE = int(os.getenv("BULK_WRITE_SIZE", "100"))
+BULK_WRITE_INTERVAL = float(os.getenv("BULK_WRITE_INTERVAL", "2"))
+BULK_WRITE_RETRIES = int(os.getenv("BULK_WRITE_RETRIES", "3"))
+
+# Mature job sink (CREATE_API)
+SINK_QUEUE_MAX = int(os.getenv("SINK_QUEUE_MAX", "500"))
+SINK_SENDERS = int(os.getenv("SINK_SENDERS", "2"))
+SINK_BATCH_SIZE = int(os.getenv("SINK_BATCH_SIZE", "20"))
+SINK_MAX_RETRIES = int(os.getenv("SINK_MAX_RETRIES", "5"))
+SINK_DRAIN_TIMEOUT = float(os.getenv("SINK_DRAIN_TIMEOUT", "120"))
+SINK_SPOOL_DIR = os.getenv("SINK_SPOOL_DIR", "spool/matureJobs")
+
+# Logging; routine per-job lines are kept at LOG_SAMPLE_RATE, errors always
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.1"))
+
+# Metrics; with PROCESS_COUNT > 1 set PROMETHEUS_MULTIPROC_DIR to an empty
+# directory (cleared before each start) so /metrics covers every pipeline
+# process. METRICS_PORT serves /metrics from daemon.py; 0 disables it
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR", "")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
 # Flask specific settings
 PORT = int(os.getenv("FLASK_APP_PORT", ""))
 HOST = os.getenv("FLASK_APP_HOST", "")
\ No newline at end of file
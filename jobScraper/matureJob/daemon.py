@@ -0,0 +1,35 @@
+import signal
+import asyncio
+import logging
+from prometheus_client import start_http_server
+from config.config import METRICS_PORT
+from services import metrics
+from services.logging_setup import configure_logging
+from module.matureJob.daemon import run_daemon
+
+logger = logging.getLogger(__name__)
+
+async def main():
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    signals = (signal.SIGINT, signal.SIGTERM)
+
+    def request_stop():
+        # The first signal finishes queued jobs; the default handlers are
+        # restored so a second Ctrl-C interrupts immediately
+        logger.info("Stopping after queued jobs, press Ctrl-C again to exit now")
+        stop.set()
+        for sig in signals:
+            loop.remove_signal_handler(sig)
+
+    for sig in signals:
+        loop.add_signal_handler(sig, request_stop)
+    if METRICS_PORT:
+        # The daemon has no Flask app, so it serves /metrics itself
+        start_http_server(METRICS_PORT, registry=metrics.registry())
+        logger.info(f"Serving metrics on port {METRICS_PORT}")
+    await run_daemon(stop)
+
+if __name__ == "__main__":
+    configure_logging()
+    asyncio.run(main())
@@ -1,7 +1,70 @@
+import asyncio
+import logging
+import threading
+from pymongo import ASCENDING, DESCENDING
 from motor.motor_asyncio import AsyncIOMotorClient
-from config.config import MONGODB_URI, DB_NAME
+from config.config import MONGODB_URI, DB_NAME, RAW_COLL, MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE
+
+logger = logging.getLogger(__name__)
+
+PENDING_INDEX = "pending_jobs"
+FRESHNESS_INDEX = "pending_jobs_by_created"
+PENDING_FLAGS = {
+    "isEasyApply": False,
+    "isMatureJob": False,
+    "linkPassed": False
+}
+
+_lock = threading.Lock()
+_client = None
+_client_loop = None
+_indexed = set()
+
+def get_client():
+    """Get the process-wide client, rebuilt only when the event loop changes"""
+    global _client, _client_loop
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    with _lock:
+        if _client is None or _client_loop is not loop:
+            if _client is not None:
+                _client.close()
+            _client = AsyncIOMotorClient(
+                MONGODB_URI,
+                maxPoolSize=MONGO_MAX_POOL_SIZE,
+                minPoolSize=MONGO_MIN_POOL_SIZE,
+            )
+            _client_loop = loop
+        return _client
 
 def get_db():
-    """Get a new database connection for each request"""
-    client = AsyncIOMotorClient(MONGODB_URI)
-    return client[DB_NAME]
+    """Get the database from the shared client"""
+    return get_client()[DB_NAME]
+
+async def ensure_indexes(db):
+    """Create the partial indexes backing the pending-job queries once per process"""
+    if DB_NAME in _indexed:
+        return
+    await db[RAW_COLL].create_index(
+        [("leaseUntil", ASCENDING)],
+        name=PENDING_INDEX,
+        partialFilterExpression=PENDING_FLAGS
+    )
+    # Claims walk pending jobs newest first
+    await db[RAW_COLL].create_index(
+        [("createdAt", DESCENDING)],
+        name=FRESHNESS_INDEX,
+        partialFilterExpression=PENDING_FLAGS
+    )
+    _indexed.add(DB_NAME)
+    logger.info(f"Ensured indexes {PENDING_INDEX}, {FRESHNESS_INDEX} on {RAW_COLL}")
+
+def close_client():
+    global _client, _client_loop
+    with _lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+        _client_loop = None
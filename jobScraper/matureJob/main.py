@@ -1,10 +1,12 @@
 from flask import Flask
 from module.matureJob.routes import mature_job_bp
+from module.metrics.routes import metrics_bp
 from config.config import PORT, HOST
 
 def create_app():
     app = Flask(__name__)
     app.register_blueprint(mature_job_bp)
+    app.register_blueprint(metrics_bp)
     return app
 
 if __name__ == "__main__":
@@ -1,20 +1,27 @@
 from flask import jsonify
 import logging
-from asgiref.sync import async_to_sync
-from .service import run_pipeline
+from services.logging_setup import configure_logging
+from .runs import run_manager
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 def handle_request():
     logger.info("Received request to /mature-job endpoint")
     try:
-        logger.info("Starting pipeline execution")
-        # Convert async function to sync using asgiref
-        result = async_to_sync(run_pipeline)()
-        logger.info(f"Pipeline completed successfully: {result}")
-        return jsonify({"status": "success", "detail": result})
+        run, started = run_manager.start()
+        if started:
+            logger.info(f"Started pipeline run {run.id}")
+        else:
+            logger.info(f"Pipeline run {run.id} already active, not starting another")
+        return jsonify({"status": "accepted" if started else "running", "detail": run.to_dict()}), 202
     except Exception as e:
-        logger.error(f"Error in pipeline execution: {str(e)}", exc_info=True)
+        logger.error(f"Error starting pipeline: {str(e)}", exc_info=True)
         return jsonify({"status": "error", "detail": str(e)}), 500
+
+def handle_status(run_id):
+    run = run_manager.get(run_id)
+    if run is None:
+        return jsonify({"status": "error", "detail": f"Run {run_id} not found"}), 404
+    return jsonify({"status": run.status, "detail": run.to_dict()})
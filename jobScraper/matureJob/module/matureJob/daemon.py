@@ -0,0 +1,158 @@
+import time
+import asyncio
+import logging
+import functools
+from datetime import datetime, timezone
+from pymongo.errors import OperationFailure, PyMongoError
+from database.mongodb import get_db, ensure_indexes
+from config.config import RAW_COLL, POLL_INTERVAL, DAEMON_STATE_COLL, DAEMON_SWEEP_INTERVAL
+from services.lease import lease_deadline
+from .helper import claim_documents
+from .service import enqueue, expire_stale, produce, run_shard
+
+logger = logging.getLogger(__name__)
+
+# Server errors meaning a stored resume token is no longer in the oplog:
+# CappedPositionLost, ChangeStreamFatalError, ChangeStreamHistoryLost
+RESUME_TOKEN_LOST = (136, 280, 286)
+
+
+class RawJobFollower:
+    """Feeds the workers from the backlog, then from new rawJobs inserts.
+
+    Inserts come from a change stream whose resume token is kept in
+    DAEMON_STATE_COLL. Without change streams (standalone server) it polls
+    for ``_id`` values above the last one seen every POLL_INTERVAL; ObjectIds
+    grow with insertion time, so this follows ``createdAt`` without an extra
+    index. Every DAEMON_SWEEP_INTERVAL stale jobs are expired and the whole
+    backlog is swept again so retries that came due and expired leases are
+    picked up. Documents are always claimed through the lease, so replicas
+    never process the same insert twice.
+    """
+
+    def __init__(self, queue, raw_coll, lease, state_coll, stop: asyncio.Event, batch_size: int):
+        self._queue = queue
+        self._raw_coll = raw_coll
+        self._lease = lease
+        self._state_coll = state_coll
+        self._stop = stop
+        self._batch_size = batch_size
+        self._state_id = f"{RAW_COLL}:inserts"
+        self._swept_at = 0.0
+        self.produced = 0
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    async def run(self) -> int:
+        await self._sweep()
+        state = await self._state_coll.find_one({"_id": self._state_id}) or {}
+        token = state.get("resumeToken")
+        if token:
+            self.logger.info("Resuming change stream from the stored token")
+
+        while not self._stop.is_set():
+            try:
+                await self._watch(token)
+            except OperationFailure as e:
+                if token and e.code in RESUME_TOKEN_LOST:
+                    self.logger.warning(f"Stored resume token expired, sweeping and watching from now: {str(e)}")
+                    token = None
+                    await self._save_state(resumeToken=None)
+                    await self._sweep()
+                    continue
+                self.logger.warning(f"Change streams unavailable, polling every {POLL_INTERVAL}s: {str(e)}")
+                await self._poll(state.get("lastId"))
+            except PyMongoError as e:
+                self.logger.error(f"Change stream error, reconnecting in {POLL_INTERVAL}s: {str(e)}")
+                await self._wait(POLL_INTERVAL)
+                state = await self._state_coll.find_one({"_id": self._state_id}) or {}
+                token = state.get("resumeToken")
+        return self.produced
+
+    async def _wait(self, seconds: float):
+        try:
+            await asyncio.wait_for(self._stop.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _save_state(self, **fields):
+        await self._state_coll.update_one(
+            {"_id": self._state_id},
+            {"$set": {**fields, "updatedAt": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+
+    async def _claim(self, ids: list):
+        docs = await claim_documents(
+            self._raw_coll, self._lease.owner, ids, lease_deadline(self._lease.lease_seconds)
+        )
+        await enqueue(self._queue, self._lease, docs)
+        self.produced += len(docs)
+
+    async def _sweep(self, force: bool = True):
+        if not force and time.monotonic() - self._swept_at < DAEMON_SWEEP_INTERVAL:
+            return
+        await expire_stale(self._raw_coll)
+        self.produced += await produce(
+            self._queue, self._raw_coll, self._lease, self._batch_size, stop=self._stop
+        )
+        self._swept_at = time.monotonic()
+
+    async def _watch(self, token):
+        pipeline = [{"$match": {"operationType": "insert"}}]
+        async with self._raw_coll.watch(pipeline, resume_after=token, max_await_time_ms=1000) as stream:
+            self.logger.info(f"Watching {RAW_COLL} for inserts")
+            try:
+                while not self._stop.is_set():
+                    ids = []
+                    while len(ids) < self._batch_size:
+                        change = await stream.try_next()
+                        if change is None:
+                            break
+                        ids.append(change["documentKey"]["_id"])
+                    if ids:
+                        self.logger.info(f"{len(ids)} new documents inserted")
+                        await self._claim(ids)
+                        await self._save_state(resumeToken=stream.resume_token)
+                    await self._sweep(force=False)
+            finally:
+                if stream.resume_token:
+                    await self._save_state(resumeToken=stream.resume_token)
+
+    async def _latest_id(self):
+        cursor = self._raw_coll.find({}, {"_id": 1}).sort("_id", -1).limit(1)
+        docs = [doc async for doc in cursor]
+        return docs[0]["_id"] if docs else None
+
+    async def _poll(self, last_id):
+        if last_id is None:
+            last_id = await self._latest_id()
+        while not self._stop.is_set():
+            query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+            cursor = self._raw_coll.find(query, {"_id": 1}).sort("_id", 1).limit(self._batch_size)
+            ids = [doc["_id"] async for doc in cursor]
+            if ids:
+                self.logger.info(f"{len(ids)} new documents found by polling")
+                last_id = ids[-1]
+                await self._claim(ids)
+                await self._save_state(lastId=last_id)
+            await self._sweep(force=False)
+            # A full page means more inserts are waiting
+            if len(ids) < self._batch_size:
+                await self._wait(POLL_INTERVAL)
+
+
+async def follow(queue, raw_coll, lease, batch_size, shard=0, shards=1, *, state_coll, stop):
+    """``process_stream`` feed that runs until ``stop`` is set"""
+    return await RawJobFollower(queue, raw_coll, lease, state_coll, stop, batch_size).run()
+
+
+async def run_daemon(stop: asyncio.Event, db=None):
+    """Process the backlog, then new rawJobs as they are inserted, until ``stop`` is set"""
+    logger.info("Starting mature job daemon")
+    if db is None:
+        db = get_db()
+    await ensure_indexes(db)
+    feed = functools.partial(follow, state_coll=db[DAEMON_STATE_COLL], stop=stop)
+    total_processed = await run_shard(db=db, feed=feed)
+    logger.info(f"Daemon stopped. Total documents processed: {total_processed}")
+    return total_processed
@@ -1,5 +1,8 @@
+import zlib
 import logging
+from datetime import datetime, timedelta, timezone
 from urllib.parse import urlparse, parse_qs
+from config.config import JOB_PRIORITY_WEIGHTS, JOB_PRIORITY_WINDOW
 
 logger = logging.getLogger(__name__)
 
@@ -33,49 +36,127 @@ def clean_url(url: str) -> str:
         logger.error(f"Error cleaning URL {url}: {e}")
         return url
 
-async def get_raw_documents(raw_coll, worker_count, queue_max):
-    """Get documents from raw collection that need processing"""
-    try:
-        # Get total count first
-        total_count = await raw_coll.count_documents({
-            "isEasyApply": False,
-            "isMatureJob": False,
-            "linkPassed": False
-        })
-        logger.info(f"Total documents matching filter: {total_count}")
-        
-        # Use a consistent snapshot by getting all matching IDs first
-        cursor = raw_coll.find(
-            {
-                "isEasyApply": False,
-                "isMatureJob": False,
-                "linkPassed": False
-            },
-            {"_id": 1}
-        ).limit(worker_count * queue_max)
-        
-        # Get all matching IDs
-        doc_ids = [doc["_id"] async for doc in cursor]
-        logger.info(f"Found {len(doc_ids)} documents to process in this batch")
-        
-        if not doc_ids:
+def pending_filter(now: datetime) -> dict:
+    """Documents that still need processing, are due for an attempt and are
+    not leased by a live instance"""
+    return {
+        "isEasyApply": False,
+        "isMatureJob": False,
+        "linkPassed": False,
+        "isDeadLetter": {"$ne": True},
+        "isExpired": {"$ne": True},
+        "$and": [
+            {"$or": [
+                {"leaseUntil": None},
+                {"leaseUntil": {"$lt": now}}
+            ]},
+            {"$or": [
+                {"nextAttemptAt": None},
+                {"nextAttemptAt": {"$lte": now}}
+            ]}
+        ]
+    }
+
+async def count_pending_documents(raw_coll, mode):
+    """Count pending documents: ``exact`` via the partial index, ``estimate``
+    from collection metadata (an upper bound), or ``off``"""
+    if mode == "exact":
+        return await raw_coll.count_documents(pending_filter(datetime.now(timezone.utc)))
+    if mode == "estimate":
+        return await raw_coll.estimated_document_count()
+    return None
+
+async def expire_stale_documents(raw_coll, max_age_days: float) -> int:
+    """Mark pending documents created more than ``max_age_days`` ago as
+    expired in a single update; they are never checked"""
+    if max_age_days <= 0:
+        return 0
+    now = datetime.now(timezone.utc)
+    result = await raw_coll.update_many(
+        {**pending_filter(now), "createdAt": {"$lt": now - timedelta(days=max_age_days)}},
+        {"$set": {"isExpired": True, "updatedAt": now}}
+    )
+    return result.modified_count
+
+def priority_age(doc: dict, now: datetime, weights: dict) -> float:
+    """Age of ``doc`` in seconds divided by its weight; lower is claimed first"""
+    created = doc.get("createdAt")
+    if not isinstance(created, datetime):
+        return float("inf")
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=timezone.utc)
+    weight = 1.0
+    for field, table in weights.items():
+        weight *= table.get(doc.get(field), 1.0)
+    if weight <= 0:
+        return float("inf")
+    return max(0.0, (now - created).total_seconds()) / weight
+
+def shard_of(doc_id, shards: int) -> int:
+    """Stable shard number for a document id"""
+    return zlib.crc32(str(doc_id).encode()) % shards
+
+async def claim_raw_documents(raw_coll, owner, limit, lease_until, shard=0, shards=1):
+    """Atomically lease up to ``limit`` pending documents for ``owner``,
+    newest first (see ``priority_age`` for weighted ordering).
+
+    Candidates are claimed with ``claim_documents``. With ``shards > 1``
+    documents that hash to ``shard`` are preferred and others are only taken
+    once none of ours are left. Returns an empty list only once no candidates remain.
+    """
+    while True:
+        now = datetime.now(timezone.utc)
+        query = pending_filter(now)
+        window = limit * shards
+        projection = {"_id": 1}
+        if JOB_PRIORITY_WEIGHTS:
+            # Weighted jobs are ranked among a wider window of the newest
+            window *= max(1, JOB_PRIORITY_WINDOW)
+            projection.update({"createdAt": 1, **{field: 1 for field in JOB_PRIORITY_WEIGHTS}})
+        cursor = raw_coll.find(query, projection).sort("createdAt", -1).limit(window)
+        candidates = [doc async for doc in cursor]
+        if not candidates:
             return []
-            
-        # Now fetch the full documents for these IDs
-        # This ensures we get a consistent set of documents
-        cursor = raw_coll.find({"_id": {"$in": doc_ids}})
-        docs = [doc async for doc in cursor]
-        
-        # Double check that none of these documents were processed while we were getting them
-        docs = [doc for doc in docs if not (
-            doc.get("isEasyApply", False) or 
-            doc.get("isMatureJob", False) or 
-            doc.get("linkPassed", False)
-        )]
-        
-        logger.info(f"Returning {len(docs)} documents for processing")
-        return docs
-        
-    except Exception as e:
-        logger.error(f"Error fetching documents: {str(e)}")
-        return []
+        if JOB_PRIORITY_WEIGHTS:
+            candidates.sort(key=lambda doc: priority_age(doc, now, JOB_PRIORITY_WEIGHTS))
+        candidate_ids = [doc["_id"] for doc in candidates]
+
+        if shards > 1:
+            own_ids = [doc_id for doc_id in candidate_ids if shard_of(doc_id, shards) == shard]
+            candidate_ids = own_ids or candidate_ids
+        candidate_ids = candidate_ids[:limit]
+
+        docs = await claim_documents(raw_coll, owner, candidate_ids, lease_until, query)
+        if docs:
+            return docs
+        logger.info(f"Lost all {len(candidate_ids)} candidates to other instances, retrying")
+
+async def claim_documents(raw_coll, owner, candidate_ids, lease_until, query=None):
+    """Lease whichever of ``candidate_ids`` are still pending and return them.
+
+    The claim is a conditional ``update_many`` read back by owner and lease
+    deadline, so a document raced by another instance is never returned to
+    both.
+    """
+    if query is None:
+        query = pending_filter(datetime.now(timezone.utc))
+    await raw_coll.update_many(
+        {**query, "_id": {"$in": candidate_ids}},
+        {"$set": {"claimedBy": owner, "leaseUntil": lease_until}}
+    )
+    # Workers only need the URL and the attempt count
+    cursor = raw_coll.find(
+        {
+            "_id": {"$in": candidate_ids},
+            "claimedBy": owner,
+            "leaseUntil": lease_until
+        },
+        {"jobUrl": 1, "attempts": 1}
+    )
+    docs = [doc async for doc in cursor]
+    # Keep the caller's priority order
+    order = {doc_id: i for i, doc_id in enumerate(candidate_ids)}
+    docs.sort(key=lambda doc: order[doc["_id"]])
+    if docs:
+        logger.info(f"Claimed {len(docs)}/{len(candidate_ids)} documents")
+    return docs
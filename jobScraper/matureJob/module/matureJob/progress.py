@@ -0,0 +1,74 @@
+import time
+import threading
+
+
+class RunProgress:
+    """Live progress of one pipeline run"""
+
+    def __init__(self):
+        self.processed = 0
+        self.total = None
+        self.started_at = time.time()
+        self._shards = None
+
+    def advance(self, count=1):
+        self.processed += count
+
+    def attach_shards(self, shared):
+        """Also count what worker processes report in ``shared``"""
+        self._shards = shared
+
+    def detach_shards(self):
+        if self._shards is not None:
+            self.processed += sum(self._shards)
+            self._shards = None
+
+    @property
+    def count(self):
+        if self._shards is None:
+            return self.processed
+        try:
+            return self.processed + sum(self._shards)
+        except Exception:
+            return self.processed
+
+
+class ShardProgress:
+    """Progress handle for a worker process; writes only its own slot.
+
+    Counts locally and publishes to the Manager list from a background
+    thread every ``interval`` seconds, so the event loop never waits on IPC.
+    ``close()`` publishes the final count.
+    """
+
+    def __init__(self, shared, shard, interval=1.0):
+        self._shared = shared
+        self._shard = shard
+        self._interval = interval
+        self._published = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"shard-{shard}-progress", daemon=True)
+        self.processed = 0
+        self._thread.start()
+
+    def advance(self, count=1):
+        self.processed += count
+
+    def _publish(self):
+        processed = self.processed
+        if processed != self._published:
+            self._shared[self._shard] = processed
+            self._published = processed
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            try:
+                self._publish()
+            except Exception:
+                # The manager may already be gone at shutdown
+                pass
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self._publish()
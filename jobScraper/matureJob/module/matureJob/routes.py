@@ -1,8 +1,12 @@
 from flask import Blueprint
-from .controller import handle_request
+from .controller import handle_request, handle_status
 
 mature_job_bp = Blueprint('mature_job', __name__)
 
 @mature_job_bp.route('/mature-job', methods=['POST'])
 def route_mature_job():
     return handle_request()
+
+@mature_job_bp.route('/mature-job/<run_id>', methods=['GET'])
+def route_mature_job_status(run_id):
+    return handle_status(run_id)
@@ -0,0 +1,97 @@
+import time
+import asyncio
+import logging
+import threading
+from uuid import uuid4
+from collections import OrderedDict
+from .service import run_pipeline
+from .progress import RunProgress
+
+logger = logging.getLogger(__name__)
+
+MAX_RUN_HISTORY = 50
+
+
+class Run:
+    def __init__(self):
+        self.id = uuid4().hex
+        self.status = "running"
+        self.progress = RunProgress()
+        self.finished_at = None
+        self.result = None
+        self.error = None
+
+    def to_dict(self):
+        end = self.finished_at or time.time()
+        elapsed = max(end - self.progress.started_at, 0.001)
+        processed = self.progress.count
+        throughput = processed / elapsed
+        eta = None
+        if self.status == "running" and self.progress.total is not None and throughput > 0:
+            eta = round(max(self.progress.total - processed, 0) / throughput, 1)
+        return {
+            "runId": self.id,
+            "status": self.status,
+            "processed": processed,
+            "total": self.progress.total,
+            "elapsedSeconds": round(elapsed, 1),
+            "throughputPerSecond": round(throughput, 3),
+            "etaSeconds": eta,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class RunManager:
+    """Runs the pipeline in the background, at most one run at a time.
+
+    Runs execute on a long-lived event loop in a daemon thread so the Flask
+    request returns immediately.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop = None
+        self._runs = OrderedDict()
+        self._active = None
+
+    def _ensure_loop(self):
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=self._loop.run_forever, name="pipeline-runner", daemon=True)
+            thread.start()
+        return self._loop
+
+    def start(self):
+        """Start a run, or return the active one. Returns ``(run, started)``."""
+        with self._lock:
+            if self._active is not None:
+                return self._active, False
+
+            run = Run()
+            self._runs[run.id] = run
+            while len(self._runs) > MAX_RUN_HISTORY:
+                self._runs.popitem(last=False)
+            self._active = run
+            asyncio.run_coroutine_threadsafe(self._execute(run), self._ensure_loop())
+            return run, True
+
+    def get(self, run_id):
+        return self._runs.get(run_id)
+
+    async def _execute(self, run):
+        try:
+            run.result = await run_pipeline(run.progress)
+            run.status = "completed"
+            logger.info(f"Pipeline run {run.id} completed: {run.result}")
+        except Exception as e:
+            run.status = "failed"
+            run.error = str(e)
+            logger.error(f"Pipeline run {run.id} failed: {str(e)}", exc_info=True)
+        finally:
+            run.finished_at = time.time()
+            with self._lock:
+                self._active = None
+
+
+run_manager = RunManager()
@@ -1,78 +1,206 @@
+import os
 import asyncio
 import logging
-from aiohttp import ClientSession, TCPConnector
-from database.mongodb import get_db
-from config.config import RAW_COLL, WORKER_COUNT, QUEUE_MAX
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from database.mongodb import get_db, ensure_indexes
+from config.config import RAW_COLL, WORKER_COUNT, QUEUE_MAX, PROCESS_COUNT, SINK_SPOOL_DIR, PENDING_COUNT_MODE, CONCURRENCY_MAX, JOB_MAX_AGE_DAYS
 from services.job_checker import JobChecker
+from services.http_client import HttpClient
+from services.bulk_writer import BulkWriter
+from services.mature_sink import MatureJobSink
+from services.lease import LeaseKeeper, lease_deadline
 from services.worker import worker
-from .helper import get_raw_documents
+from services.logging_setup import configure_logging
+from services.concurrency import ConcurrencyController
+from services.metrics import QUEUE_DEPTH, JOBS, process_exited
+from .helper import claim_raw_documents, count_pending_documents, expire_stale_documents
+from .progress import RunProgress, ShardProgress
 
 logger = logging.getLogger(__name__)
 
-async def process_batch(checker, http, raw_coll, worker_count, queue_max):
-    """Process a single batch of documents"""
-    queue = asyncio.Queue()
-    
-    # Fetch raw documents for this batch
-    docs = await get_raw_documents(raw_coll, worker_count, queue_max)
-    if not docs:
-        return 0
-        
-    logger.info(f"Processing batch of {len(docs)} documents")
-    
+async def enqueue(queue, lease, docs):
+    """Hold the leases on freshly claimed ``docs`` and queue them for the workers"""
+    lease.hold(doc["_id"] for doc in docs)
     for doc in docs:
         await queue.put(doc)
+        QUEUE_DEPTH.set(queue.qsize())
+
+async def expire_stale(raw_coll):
+    """Expire pending jobs older than JOB_MAX_AGE_DAYS before anything is claimed"""
+    try:
+        expired = await expire_stale_documents(raw_coll, JOB_MAX_AGE_DAYS)
+    except Exception as e:
+        logger.error(f"Error expiring stale documents: {str(e)}")
+        return 0
+    if expired:
+        JOBS.labels("expired").inc(expired)
+        logger.info(f"Expired {expired} pending documents older than {JOB_MAX_AGE_DAYS:g} days")
+    return expired
+
+async def produce(queue, raw_coll, lease, batch_size, shard=0, shards=1, stop=None):
+    """Claim candidate documents in batches and stream them into the bounded queue.
+
+    When ``stop`` is set, no further batch is claimed.
+    """
+    produced = 0
+    try:
+        while stop is None or not stop.is_set():
+            docs = await claim_raw_documents(
+                raw_coll, lease.owner, batch_size, lease_deadline(lease.lease_seconds), shard, shards
+            )
+            if not docs:
+                break
+            await enqueue(queue, lease, docs)
+            produced += len(docs)
+    except Exception as e:
+        logger.error(f"Error claiming documents: {str(e)}")
+    logger.info(f"Producer finished after {produced} documents")
+    return produced
+
+async def process_stream(checker, raw_coll, writer, sink, lease, progress, worker_count, queue_max, shard=0, shards=1, feed=produce):
+    """Feed long-lived workers from a claiming producer until it returns.
 
-    # Start worker tasks
+    ``feed`` defaults to ``produce``, which returns once the backlog runs dry.
+    """
+    queue = asyncio.Queue(maxsize=queue_max)
+
+    # worker_count workers take jobs at first; the controller moves the limit
+    # between CONCURRENCY_MIN and CONCURRENCY_MAX as the run goes
+    controller = ConcurrencyController(checker.http, queue.qsize, initial=worker_count)
+    controller.start()
+
+    # Start worker tasks once for the whole run
     workers = []
-    for i in range(worker_count):
-        w = asyncio.create_task(worker(i, queue, checker, raw_coll, http))
+    for i in range(controller.maximum):
+        w = asyncio.create_task(worker(i, queue, checker, writer, sink, lease, progress, controller))
         workers.append(w)
 
-    # Wait until queue is fully processed
-    await queue.join()
+    try:
+        produced = await feed(queue, raw_coll, lease, queue_max, shard, shards)
 
-    # Cancel worker tasks
-    for w in workers:
-        w.cancel()
-        
-    return len(docs)
+        # Wait until everything the producer queued is processed
+        await queue.join()
+        return produced
+    finally:
+        await controller.close()
+        for w in workers:
+            w.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+async def run_shard(shard=0, shards=1, progress=None, db=None, feed=produce):
+    """Run one pipeline (browser, HTTP client, Mongo client) and return the processed count"""
+    logger.info(f"Initializing pipeline shard {shard + 1}/{shards}")
+
+    # Set up the HTTP client shared by the checker and the workers, sized
+    # for the most workers the concurrency controller may run
+    logger.info(f"Setting up HTTP client for up to {CONCURRENCY_MAX} workers")
+    http = HttpClient(limit=CONCURRENCY_MAX, limit_per_host=CONCURRENCY_MAX)
 
-async def run_pipeline():
-    logger.info("Initializing pipeline")
-    total_processed = 0
-    batch_size = WORKER_COUNT * QUEUE_MAX  # 5 * 200 = 1000 per batch
-    
     # Initialize browser for job checking
     logger.info("Initializing browser for job checking")
-    checker = JobChecker()
+    checker = JobChecker(http)
     await checker.init_browser()
     logger.info("Browser initialized successfully")
 
-    # Set up HTTP session with connector limits
-    logger.info(f"Setting up HTTP session with {WORKER_COUNT} workers")
-    connector = TCPConnector(limit=WORKER_COUNT, limit_per_host=WORKER_COUNT)
-    http = ClientSession(connector=connector)
+    # Shared database client for this process
+    if db is None:
+        db = get_db()
+    raw_coll = db[RAW_COLL]
+    writer = BulkWriter(raw_coll)
+    writer.start()
+
+    # Claimed documents are leased to this instance until processed
+    lease = LeaseKeeper(raw_coll)
+    lease.start()
+    logger.info(f"Claiming documents as {lease.owner}")
+
+    # Mature jobs are posted to CREATE_API by the sink's own sender tasks;
+    # each process replays only its own spool
+    spool_dir = SINK_SPOOL_DIR if shards == 1 else os.path.join(SINK_SPOOL_DIR, f"shard-{shard}")
+    sink = MatureJobSink(http, spool_dir)
+    await sink.start()
 
     try:
-        # Get a fresh database connection for this request
-        db = get_db()
-        raw_coll = db[RAW_COLL]
-        
-        # Process batches until no more documents are found
-        while True:
-            batch_count = await process_batch(checker, http, raw_coll, WORKER_COUNT, QUEUE_MAX)
-            if batch_count == 0:
-                break
-            total_processed += batch_count
-            logger.info(f"Completed batch. Total processed so far: {total_processed}")
-            
-        logger.info(f"Pipeline completed. Total documents processed: {total_processed}")
-        return f"Processed {total_processed} documents in total"
-        
+        total_processed = await process_stream(
+            checker, raw_coll, writer, sink, lease, progress or RunProgress(), WORKER_COUNT, QUEUE_MAX, shard, shards, feed
+        )
+        logger.info(f"Shard {shard + 1}/{shards} completed. Documents processed: {total_processed}")
+        return total_processed
+
     finally:
         # Cleanup resources
         logger.info("Cleaning up resources")
+        await writer.close()
+        await lease.close()
+        await sink.close()
         await checker.close()
         await http.close()
         logger.info("Pipeline completed successfully")
+
+def _run_shard_process(shard, shards, shared_progress):
+    """Entry point of a pipeline worker process"""
+    configure_logging()
+    progress = ShardProgress(shared_progress, shard)
+    try:
+        return asyncio.run(run_shard(shard, shards, progress))
+    finally:
+        progress.close()
+        process_exited()
+
+async def run_pipeline_multiprocess(processes, progress):
+    """Run one pipeline per process, sharded by ``_id``, and sum their counts"""
+    logger.info(f"Starting {processes} pipeline processes")
+    loop = asyncio.get_running_loop()
+    # Playwright and Motor do not survive fork, so children are spawned
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager:
+        # Each process reports its live count in its own slot
+        shared_progress = manager.list([0] * processes)
+        progress.attach_shards(shared_progress)
+        try:
+            with ProcessPoolExecutor(max_workers=processes, mp_context=context) as pool:
+                results = await asyncio.gather(
+                    *(
+                        loop.run_in_executor(pool, _run_shard_process, shard, processes, shared_progress)
+                        for shard in range(processes)
+                    ),
+                    return_exceptions=True
+                )
+        finally:
+            progress.detach_shards()
+
+    total_processed = 0
+    failures = []
+    for shard, result in enumerate(results):
+        if isinstance(result, BaseException):
+            logger.error(f"Pipeline process {shard + 1}/{processes} failed: {str(result)}")
+            failures.append(result)
+        else:
+            total_processed += result
+
+    if failures:
+        raise RuntimeError(
+            f"{len(failures)}/{processes} pipeline processes failed after processing {total_processed} documents"
+        )
+    return total_processed
+
+async def run_pipeline(progress=None, db=None):
+    logger.info("Initializing pipeline")
+    progress = progress or RunProgress()
+    if db is None:
+        db = get_db()
+    await ensure_indexes(db)
+    await expire_stale(db[RAW_COLL])
+    try:
+        progress.total = await count_pending_documents(db[RAW_COLL], PENDING_COUNT_MODE)
+        logger.info(f"Total documents pending ({PENDING_COUNT_MODE}): {progress.total}")
+    except Exception as e:
+        logger.warning(f"Could not count pending documents: {str(e)}")
+
+    if PROCESS_COUNT > 1:
+        total_processed = await run_pipeline_multiprocess(PROCESS_COUNT, progress)
+    else:
+        total_processed = await run_shard(progress=progress, db=db)
+    logger.info(f"Pipeline completed. Total documents processed: {total_processed}")
+    return f"Processed {total_processed} documents in total"
@@ -0,0 +1,6 @@
+from flask import Response
+from services.metrics import render
+
+def handle_metrics():
+    body, content_type = render()
+    return Response(body, content_type=content_type)
@@ -0,0 +1,8 @@
+from flask import Blueprint
+from .controller import handle_metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def route_metrics():
+    return handle_metrics()
@@ -0,0 +1,194 @@
+import os
+import re
+import time
+import hashlib
+import sqlite3
+import logging
+import asyncio
+import threading
+from urllib.parse import urlparse
+from playwright.async_api import Route
+from services.metrics import ASSET_REQUESTS, ASSET_BYTES
+from config.config import (
+    ASSET_CACHE_DIR,
+    ASSET_CACHE_TTL,
+    ASSET_CACHE_PATTERN,
+    ASSET_BLOCK_HOSTS,
+    ASSET_BLOCK_PATTERN,
+)
+
+BLOCKED_RESOURCE_TYPES = ("image", "stylesheet", "font", "media")
+
+
+class AssetCache:
+    """Playwright route handler that blocks what job pages do not need and
+    serves versioned scripts from disk.
+
+    Requests for blocked resource types, ASSET_BLOCK_HOSTS (and their
+    subdomains) or URLs matching ASSET_BLOCK_PATTERN are aborted. GETs
+    matching ASSET_CACHE_PATTERN are fetched once with ``route.fetch`` and
+    then fulfilled from a content-addressed store: bodies live under their
+    SHA-256 in ``directory`` and a SQLite index maps URLs to digests, so
+    identical bundles behind different URLs are stored once.
+    """
+
+    def __init__(self, directory: str = ASSET_CACHE_DIR, ttl: float = ASSET_CACHE_TTL):
+        self._directory = directory
+        self._ttl = ttl
+        self._cacheable = re.compile(ASSET_CACHE_PATTERN) if ASSET_CACHE_PATTERN else None
+        self._blocked = re.compile(ASSET_BLOCK_PATTERN) if ASSET_BLOCK_PATTERN else None
+        self._blocked_hosts = tuple(host.lower() for host in ASSET_BLOCK_HOSTS)
+        self._db = None
+        self._db_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.blocked = 0
+        self.bytes_fetched = 0
+        self.bytes_served = 0
+        self.seconds_saved = 0.0
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def _connect(self):
+        if self._db is None:
+            os.makedirs(self._directory, exist_ok=True)
+            self._db = sqlite3.connect(
+                os.path.join(self._directory, "index.sqlite3"), timeout=30, check_same_thread=False
+            )
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS assets (url TEXT PRIMARY KEY, digest TEXT NOT NULL, "
+                "content_type TEXT NOT NULL, fetch_seconds REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.commit()
+        return self._db
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self._directory, digest[:2], digest)
+
+    def _load(self, url: str):
+        with self._db_lock:
+            row = self._connect().execute(
+                "SELECT digest, content_type, fetch_seconds, expires_at FROM assets WHERE url = ?", (url,)
+            ).fetchone()
+        if not row or row[3] <= time.time():
+            return None
+        try:
+            with open(self._blob_path(row[0]), "rb") as f:
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        return body, row[1], row[2]
+
+    def _store(self, url: str, body: bytes, content_type: str, fetch_seconds: float):
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(body)
+            os.replace(tmp, path)
+        with self._db_lock:
+            db = self._connect()
+            db.execute(
+                "INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?, ?)",
+                (url, digest, content_type, fetch_seconds, time.time() + self._ttl)
+            )
+            db.commit()
+
+    def is_blocked(self, url: str) -> bool:
+        host = (urlparse(url).hostname or "").lower()
+        if any(host == blocked or host.endswith(f".{blocked}") for blocked in self._blocked_hosts):
+            return True
+        return bool(self._blocked and self._blocked.search(url))
+
+    def is_cacheable(self, url: str) -> bool:
+        return bool(self._cacheable and self._cacheable.match(url))
+
+    async def handle(self, route: Route):
+        """Route handler for ``BrowserContext.route("**/*", ...)``"""
+        request = route.request
+        if request.resource_type in BLOCKED_RESOURCE_TYPES or self.is_blocked(request.url):
+            self.blocked += 1
+            ASSET_REQUESTS.labels("blocked").inc()
+            await self._resolve(route, route.abort)
+        elif request.method == "GET" and self.is_cacheable(request.url):
+            try:
+                await self._serve(route, request.url)
+            except Exception as e:
+                # Nothing was fulfilled; let the browser load it (or fail it)
+                # so the script never hangs the page
+                self.logger.warning(f"Asset cache could not serve {request.url}: {str(e)}")
+                if not await self._resolve(route, route.continue_):
+                    await self._resolve(route, route.abort)
+        else:
+            await self._resolve(route, route.continue_)
+
+    async def _resolve(self, route: Route, action) -> bool:
+        try:
+            await action()
+            return True
+        except Exception as e:
+            # The page may have navigated away or closed mid-request
+            self.logger.debug(f"Route handling failed for {route.request.url}: {str(e)}")
+            return False
+
+    async def _serve(self, route: Route, url: str):
+        """Fulfil ``route`` from the cache or the network; raises only when it
+        was not fulfilled"""
+        try:
+            cached = await asyncio.to_thread(self._load, url)
+        except (sqlite3.Error, OSError) as e:
+            self.logger.error(f"Asset cache read failed for {url}: {str(e)}")
+            cached = None
+
+        if cached:
+            body, content_type, fetch_seconds = cached
+            self.hits += 1
+            self.bytes_served += len(body)
+            self.seconds_saved += fetch_seconds
+            ASSET_REQUESTS.labels("hit").inc()
+            ASSET_BYTES.labels("cache").inc(len(body))
+            await route.fulfill(
+                status=200,
+                body=body,
+                headers={"content-type": content_type, "access-control-allow-origin": "*"}
+            )
+            return
+
+        started = time.monotonic()
+        response = await route.fetch()
+        body = await response.body()
+        fetch_seconds = time.monotonic() - started
+        self.misses += 1
+        self.bytes_fetched += len(body)
+        ASSET_REQUESTS.labels("miss").inc()
+        ASSET_BYTES.labels("network").inc(len(body))
+        await route.fulfill(response=response, body=body)
+
+        if response.status == 200:
+            content_type = response.headers.get("content-type", "application/javascript")
+            try:
+                await asyncio.to_thread(self._store, url, body, content_type, fetch_seconds)
+            except Exception as e:
+                # Already fulfilled, so this must not reach the fallback in handle
+                self.logger.error(f"Asset cache write failed for {url}: {str(e)}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "blocked": self.blocked,
+            "bytesFetched": self.bytes_fetched,
+            "bytesServed": self.bytes_served,
+            "secondsSaved": round(self.seconds_saved, 1),
+        }
+
+    def close(self):
+        self.logger.info(f"Asset cache stats: {self.stats()}")
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,143 @@
+import logging
+import asyncio
+from collections import Counter
+from contextlib import asynccontextmanager
+import psutil
+from services.metrics import BROWSER_RESTARTS, BROWSER_RSS
+from config.config import (
+    BROWSER_MAX_RSS_MB,
+    BROWSER_MAX_PAGES,
+    BROWSER_CHECK_INTERVAL,
+    BROWSER_DRAIN_TIMEOUT,
+)
+
+BROWSER_PROCESS_NAMES = ("chrom", "headless_shell")
+
+
+def browser_rss() -> int:
+    """Resident memory of the Chromium processes started by this process"""
+    total = 0
+    for child in psutil.Process().children(recursive=True):
+        try:
+            if any(name in child.name().lower() for name in BROWSER_PROCESS_NAMES):
+                total += child.memory_info().rss
+        except psutil.Error:
+            pass
+    return total
+
+
+class BrowserGovernor:
+    """Restarts Chromium when it grows too large, has served too many pages or dies.
+
+    Browser work runs inside ``session()``. A restart stops new sessions,
+    waits up to ``drain_timeout`` seconds for the running ones to finish and
+    then awaits ``relaunch``, which must close the old browser and start a
+    new one.
+    """
+
+    def __init__(
+        self,
+        relaunch,
+        max_rss_mb: int = BROWSER_MAX_RSS_MB,
+        max_pages: int = BROWSER_MAX_PAGES,
+        interval: int = BROWSER_CHECK_INTERVAL,
+        drain_timeout: int = BROWSER_DRAIN_TIMEOUT,
+    ):
+        self._relaunch = relaunch
+        self._max_rss = max_rss_mb * 1024 * 1024
+        self._max_pages = max_pages
+        self._interval = interval
+        self._drain_timeout = drain_timeout
+        self._ready = asyncio.Event()
+        self._ready.set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._in_flight = 0
+        self._monitor_task = None
+        self._restart_task = None
+        self._closed = False
+        self.pages_served = 0
+        self.rss = 0
+        self.restarts = Counter()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def start(self):
+        if self._monitor_task is None and self._interval > 0:
+            self._monitor_task = asyncio.create_task(self._monitor())
+
+    @property
+    def restarting(self) -> bool:
+        return self._restart_task is not None and not self._restart_task.done()
+
+    @asynccontextmanager
+    async def session(self):
+        """Hold the browser for one job; waits while a restart is in progress."""
+        await self._ready.wait()
+        self._in_flight += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self.pages_served += 1
+            if not self._in_flight:
+                self._idle.set()
+            if self._max_pages and self.pages_served >= self._max_pages:
+                self.request_restart("pages")
+
+    def on_disconnected(self, browser=None):
+        """Playwright ``disconnected`` handler"""
+        if self._closed or self.restarting:
+            return
+        self.logger.warning("Browser disconnected unexpectedly")
+        self.request_restart("disconnected")
+
+    def request_restart(self, reason: str):
+        if self._closed or self.restarting:
+            return
+        self._ready.clear()
+        self._restart_task = asyncio.create_task(self._restart(reason))
+
+    async def _restart(self, reason: str):
+        self.logger.info(
+            f"♻️ Restarting browser ({reason}): {self.pages_served} pages served, "
+            f"{self.rss / 1024 / 1024:.0f} MB RSS, draining {self._in_flight} pages"
+        )
+        try:
+            try:
+                await asyncio.wait_for(self._idle.wait(), timeout=self._drain_timeout)
+            except asyncio.TimeoutError:
+                self.logger.warning(f"Restarting with {self._in_flight} pages still in flight")
+            await self._relaunch()
+            self.restarts[reason] += 1
+            BROWSER_RESTARTS.labels(reason).inc()
+            self.pages_served = 0
+        except Exception as e:
+            self.logger.error(f"Browser restart failed: {str(e)}")
+        finally:
+            self._ready.set()
+
+    async def _monitor(self):
+        while True:
+            await asyncio.sleep(self._interval)
+            if self.restarting:
+                continue
+            try:
+                self.rss = await asyncio.to_thread(browser_rss)
+            except Exception as e:
+                self.logger.debug(f"Failed to measure browser memory: {str(e)}")
+                continue
+            BROWSER_RSS.set(self.rss)
+            if self._max_rss and self.rss > self._max_rss:
+                self.request_restart("memory")
+
+    async def close(self):
+        """Stop monitoring; waits for a restart already in progress."""
+        self._closed = True
+        if self._monitor_task:
+            self._monitor_task.cancel()
+            await asyncio.gather(self._monitor_task, return_exceptions=True)
+            self._monitor_task = None
+        if self._restart_task:
+            await asyncio.gather(self._restart_task, return_exceptions=True)
+        self.logger.info(f"Browser restarts by reason: {dict(self.restarts)}")
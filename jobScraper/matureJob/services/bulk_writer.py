@@ -0,0 +1,95 @@
+import logging
+import asyncio
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+from services.metrics import time_stage
+from config.config import BULK_WRITE_SIZE, BULK_WRITE_INTERVAL, BULK_WRITE_RETRIES
+
+
+class BulkWriter:
+    """Write-behind buffer that flushes rawJobs flag updates as bulk writes.
+
+    Updates are flushed as one unordered ``bulk_write`` once ``max_ops`` are
+    buffered or every ``interval`` seconds, whichever comes first. Only the
+    ops reported as failed in a partial ``BulkWriteError`` are retried.
+    """
+
+    def __init__(self, coll, max_ops: int = BULK_WRITE_SIZE, interval: float = BULK_WRITE_INTERVAL,
+                 max_retries: int = BULK_WRITE_RETRIES):
+        self._coll = coll
+        self._max_ops = max(1, max_ops)
+        self._interval = interval
+        self._max_retries = max_retries
+        self._ops = []
+        self._lock = asyncio.Lock()
+        self._task = None
+        self.flushes = 0
+        self.written = 0
+        self.saved = 0
+        self.failed = 0
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_periodically())
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                self.logger.error(f"Periodic flush failed: {str(e)}")
+
+    async def update(self, doc_id, fields: dict):
+        """Queue a ``$set`` of ``fields`` for one document."""
+        self._ops.append(UpdateOne({"_id": doc_id}, {"$set": fields}))
+        if len(self._ops) >= self._max_ops:
+            await self.flush()
+
+    async def flush(self):
+        async with self._lock:
+            ops, self._ops = self._ops, []
+            if not ops:
+                return
+            written = await self._write(ops)
+            self.flushes += 1
+            self.written += written
+            # One round trip instead of one per op
+            self.saved += max(0, written - 1)
+            self.logger.info(f"Flushed {written}/{len(ops)} updates, saved {max(0, written - 1)} round trips")
+
+    async def _write(self, ops: list) -> int:
+        total = len(ops)
+        for attempt in range(self._max_retries + 1):
+            try:
+                with time_stage("mongo_write"):
+                    await self._coll.bulk_write(ops, ordered=False)
+                return total
+            except BulkWriteError as e:
+                failed = {err["index"] for err in e.details.get("writeErrors", [])}
+                self.logger.warning(f"Bulk write attempt {attempt + 1}: {len(failed)}/{len(ops)} ops failed")
+                ops = [op for i, op in enumerate(ops) if i in failed]
+                if not ops:
+                    return total
+            except PyMongoError as e:
+                self.logger.warning(f"Bulk write attempt {attempt + 1} failed: {str(e)}")
+            await asyncio.sleep(min(2 ** attempt, 10))
+
+        self.failed += len(ops)
+        self.logger.error(f"Dropping {len(ops)} updates after {self._max_retries + 1} attempts")
+        return total - len(ops)
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        self.logger.info(
+            f"Bulk writer closed: {self.written} updates in {self.flushes} flushes, "
+            f"saved {self.saved} round trips, {self.failed} failed"
+        )
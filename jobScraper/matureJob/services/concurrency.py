@@ -0,0 +1,128 @@
+import logging
+import asyncio
+import psutil
+from services.metrics import WORKERS_ACTIVE_LIMIT
+from config.config import (
+    WORKER_COUNT,
+    CONCURRENCY_MIN,
+    CONCURRENCY_MAX,
+    CONCURRENCY_INTERVAL,
+    CONCURRENCY_DECREASE,
+    CONCURRENCY_LATENCY_TARGET,
+    CONCURRENCY_MAX_ERROR_RATE,
+    CONCURRENCY_MAX_CPU,
+    CONCURRENCY_MAX_MEMORY,
+)
+
+
+class ConcurrencyController:
+    """AIMD limit on how many checker workers take jobs at once.
+
+    Workers are started up to ``maximum`` and worker ``i`` only takes a job
+    while ``i < limit``. Every ``interval`` seconds the limit grows by one
+    while work is waiting, or is multiplied by CONCURRENCY_DECREASE when the
+    last window saw 429s, too many errors, slow jobs or a loaded host.
+    """
+
+    def __init__(
+        self,
+        http,
+        backlog,
+        initial: int = WORKER_COUNT,
+        minimum: int = CONCURRENCY_MIN,
+        maximum: int = CONCURRENCY_MAX,
+        interval: float = CONCURRENCY_INTERVAL,
+    ):
+        self._http = http
+        self._backlog = backlog
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(max(initial, self.minimum), self.maximum)
+        self._interval = interval
+        self._changed = asyncio.Condition()
+        self._task = None
+        self._reset_window()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def _reset_window(self):
+        self._jobs = 0
+        self._errors = 0
+        self._seconds = 0.0
+        self._throttled = self._http.throttled
+
+    def start(self):
+        WORKERS_ACTIVE_LIMIT.set(self.limit)
+        if self._task is None and self._interval > 0 and self.minimum < self.maximum:
+            # Prime the CPU counter so the first window reads a real value
+            psutil.cpu_percent(interval=None)
+            self._task = asyncio.create_task(self._run())
+
+    async def wait_turn(self, worker_id: int):
+        """Block worker ``worker_id`` while it is above the current limit."""
+        if worker_id < self.limit:
+            return
+        async with self._changed:
+            await self._changed.wait_for(lambda: worker_id < self.limit)
+
+    def record(self, seconds: float, ok: bool):
+        """Account one finished job."""
+        self._jobs += 1
+        self._seconds += seconds
+        if not ok:
+            self._errors += 1
+
+    def decide(self, cpu: float, memory: float) -> tuple:
+        """New limit and the reason for it, from the window since the last call"""
+        throttled = self._http.throttled - self._throttled
+        error_rate = self._errors / self._jobs if self._jobs else 0.0
+        latency = self._seconds / self._jobs if self._jobs else 0.0
+
+        if throttled:
+            reason = f"{throttled} responses throttled"
+        elif error_rate > CONCURRENCY_MAX_ERROR_RATE:
+            reason = f"error rate {error_rate:.0%}"
+        elif latency > CONCURRENCY_LATENCY_TARGET:
+            reason = f"mean job latency {latency:.1f}s"
+        elif cpu > CONCURRENCY_MAX_CPU:
+            reason = f"CPU at {cpu:.0f}%"
+        elif memory > CONCURRENCY_MAX_MEMORY:
+            reason = f"memory at {memory:.0f}%"
+        else:
+            reason = None
+
+        if reason:
+            return max(self.minimum, int(self.limit * CONCURRENCY_DECREASE)), f"decrease: {reason}"
+        if not self._backlog():
+            return self.limit, "hold: no jobs waiting"
+        if not self._jobs:
+            return self.limit, "hold: no jobs finished"
+        return min(self.maximum, self.limit + 1), "increase: jobs waiting"
+
+    async def _set_limit(self, limit: int):
+        async with self._changed:
+            self.limit = limit
+            self._changed.notify_all()
+        WORKERS_ACTIVE_LIMIT.set(limit)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                cpu = psutil.cpu_percent(interval=None)
+                memory = psutil.virtual_memory().percent
+                limit, reason = self.decide(cpu, memory)
+                self.logger.info(
+                    f"Concurrency {self.limit} -> {limit} ({reason}); {self._jobs} jobs, "
+                    f"{self._errors} errors, cpu {cpu:.0f}%, memory {memory:.0f}%"
+                )
+                self._reset_window()
+                if limit != self.limit:
+                    await self._set_limit(limit)
+            except Exception as e:
+                self.logger.error(f"Concurrency controller error: {str(e)}")
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
@@ -0,0 +1,132 @@
+import logging
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from aiohttp import ClientSession, TCPConnector
+from config.config import (
+    WORKER_COUNT,
+    HTTP_DNS_TTL,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_MAX_RETRIES,
+    HTTP_RETRY_AFTER_DEFAULT,
+)
+
+
+class TokenBucket:
+    """Async token bucket that can be paused when the host answers 429."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = max(rate, 0.001)
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for ``seconds`` and drain the bucket."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+        # Refill from empty once the pause ends, not across it
+        self._updated = self._blocked_until
+
+
+def parse_retry_after(value: str, default: float) -> float:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return default
+
+
+class HttpClient:
+    """Shared aiohttp session with keep-alive pooling and per-host rate limits."""
+
+    def __init__(self, limit: int = WORKER_COUNT, limit_per_host: int = WORKER_COUNT):
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._session = None
+        self._buckets = {}
+        self.throttled = 0
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @property
+    def session(self) -> ClientSession:
+        if self._session is None or self._session.closed:
+            connector = TCPConnector(
+                limit=self._limit,
+                limit_per_host=self._limit_per_host,
+                use_dns_cache=True,
+                ttl_dns_cache=HTTP_DNS_TTL,
+                keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+            )
+            self._session = ClientSession(connector=connector)
+        return self._session
+
+    def limit_host(self, url: str, rate: float, burst: int):
+        """Rate limit every request to the host of ``url``; the first limit set wins."""
+        host = urlparse(url).netloc
+        if host and host not in self._buckets:
+            self._buckets[host] = TokenBucket(rate, burst)
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, **kwargs):
+        bucket = self._buckets.get(urlparse(url).netloc)
+        resp = None
+        for attempt in range(HTTP_MAX_RETRIES + 1):
+            if bucket:
+                await bucket.acquire()
+            resp = await self.session.request(method, url, **kwargs)
+            if resp.status != 429 or attempt == HTTP_MAX_RETRIES:
+                break
+
+            self.throttled += 1
+            delay = parse_retry_after(resp.headers.get("Retry-After", ""), HTTP_RETRY_AFTER_DEFAULT)
+            self.logger.warning(f"429 from {urlparse(url).netloc}, backing off {delay:.1f}s")
+            resp.release()
+            if bucket:
+                bucket.pause(delay)
+            else:
+                await asyncio.sleep(delay)
+
+        try:
+            yield resp
+        finally:
+            resp.release()
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import asyncio
+import threading
+from collections import OrderedDict
+from config.config import JOB_CACHE_SIZE, JOB_CACHE_TTL, JOB_CACHE_PATH
+
+
+class JobResultCache:
+    """Classification results keyed by LinkedIn job id.
+
+    Lookups go to an in-memory LRU first and a local SQLite store second;
+    entries expire after ``ttl`` seconds. Concurrent lookups for the same
+    job id share a single check.
+    """
+
+    def __init__(self, path: str = JOB_CACHE_PATH, size: int = JOB_CACHE_SIZE, ttl: float = JOB_CACHE_TTL):
+        self._path = path
+        self._size = max(1, size)
+        self._ttl = ttl
+        self._memory = OrderedDict()
+        self._inflight = {}
+        self._db = None
+        self._db_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._miss_seconds = 0.0
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def _connect(self):
+        if self._db is None:
+            if os.path.dirname(self._path):
+                os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            self._db = sqlite3.connect(self._path, timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS job_results "
+                "(job_id TEXT PRIMARY KEY, result TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.commit()
+        return self._db
+
+    def _load(self, job_id: str):
+        with self._db_lock:
+            row = self._connect().execute(
+                "SELECT result, expires_at FROM job_results WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row and row[1] > time.time():
+            return row[0]
+        return None
+
+    def _store(self, job_id: str, result: str):
+        with self._db_lock:
+            db = self._connect()
+            db.execute(
+                "INSERT OR REPLACE INTO job_results VALUES (?, ?, ?)", (job_id, result, time.time() + self._ttl)
+            )
+            db.commit()
+
+    def _remember(self, job_id: str, result: dict, expires_at: float):
+        self._memory[job_id] = (result, expires_at)
+        self._memory.move_to_end(job_id)
+        while len(self._memory) > self._size:
+            self._memory.popitem(last=False)
+
+    async def get(self, job_id: str):
+        entry = self._memory.get(job_id)
+        if entry:
+            if entry[1] > time.time():
+                self._memory.move_to_end(job_id)
+                return entry[0]
+            del self._memory[job_id]
+
+        try:
+            stored = await asyncio.to_thread(self._load, job_id)
+        except sqlite3.Error as e:
+            self.logger.error(f"Cache read failed for {job_id}: {str(e)}")
+            return None
+        if stored is None:
+            return None
+        result = json.loads(stored)
+        self._remember(job_id, result, time.time() + self._ttl)
+        return result
+
+    async def put(self, job_id: str, result: dict):
+        self._remember(job_id, result, time.time() + self._ttl)
+        try:
+            await asyncio.to_thread(self._store, job_id, json.dumps(result))
+        except sqlite3.Error as e:
+            self.logger.error(f"Cache write failed for {job_id}: {str(e)}")
+
+    async def get_or_check(self, job_id: str, check, cacheable=None):
+        """Return the cached result for ``job_id`` or run ``check()`` once for all callers.
+
+        Only results returned by ``check`` (and accepted by ``cacheable``, when
+        given) are cached; exceptions propagate to every waiting caller and
+        nothing is stored.
+        """
+        cached = await self.get(job_id)
+        if cached is not None:
+            self.hits += 1
+            return {**cached, "resolvedBy": "cache"}
+
+        inflight = self._inflight.get(job_id)
+        if inflight:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[job_id] = future
+        started = time.monotonic()
+        try:
+            result = await check()
+        except asyncio.CancelledError:
+            # Waiters must not see our cancellation as their own
+            future.set_exception(RuntimeError(f"Check for job {job_id} was cancelled"))
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieve it so an unawaited future does not warn
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            self._miss_seconds += time.monotonic() - started
+            if cacheable is None or cacheable(result):
+                await self.put(job_id, result)
+            return result
+        finally:
+            del self._inflight[job_id]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        avg_check = self._miss_seconds / self.misses if self.misses else 0.0
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hitRate": round(self.hits / lookups, 3) if lookups else 0.0,
+            # Estimated from the average duration of uncached checks
+            "secondsSaved": round((self.hits + self.coalesced) * avg_check, 1),
+        }
+
+    def close(self):
+        self.logger.info(f"Job cache stats: {self.stats()}")
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -1,22 +1,50 @@
+import re
+import html
 import logging
 import asyncio
-import aiohttp
 import random
-from urllib.parse import urlparse, parse_qs, urlencode
-from playwright.async_api import async_playwright, Browser, Page, Error as PlaywrightError
+from collections import Counter
+from urllib.parse import urlparse, urljoin
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from module.matureJob.helper import extract_job_id, clean_url
-from config.config import LINKEDIN_JOB_POSTING_API
+from config.config import (
+    LINKEDIN_JOB_POSTING_API,
+    LINKEDIN_API_RATE,
+    LINKEDIN_API_BURST,
+    PAGE_POOL_SIZE,
+    PAGE_POOL_MAX_USES,
+)
+from services.page_pool import PagePool
+from services.browser_governor import BrowserGovernor
+from services.http_client import HttpClient
+from services.job_cache import JobResultCache
+from services.asset_cache import AssetCache
+from services.metrics import time_stage, CLASSIFICATIONS
+
+# Any quoted externalApply URL: the offsite anchor's href, or the copy LinkedIn
+# keeps in a comment inside <code id="applyUrl">
+EXTERNAL_APPLY_URL = re.compile(r'(["\'])((?:(?!\1)[^\s<>])*externalApply(?:(?!\1)[^\s<>])*[?&](?:amp;)?url=(?:(?!\1)[^\s<>])*)\1')
 
 class JobChecker:
-    def __init__(self):
+    def __init__(self, http: HttpClient = None):
         self._playwright = None
+        self._owns_http = http is None
+        self.http = http or HttpClient()
+        self.http.limit_host(LINKEDIN_JOB_POSTING_API, LINKEDIN_API_RATE, LINKEDIN_API_BURST)
         self.browser = None
+        self.pool = PagePool(self.new_context, PAGE_POOL_SIZE, PAGE_POOL_MAX_USES)
+        self.governor = BrowserGovernor(self.relaunch_browser)
+        self.cache = JobResultCache()
+        self.assets = AssetCache()
+        self.resolved = Counter()
         self.logger = logging.getLogger(self.__class__.__name__)
 
     async def init_browser(self) -> Browser:
         if not self.browser:
             try:
-                self._playwright = await async_playwright().start()
+                if not self._playwright:
+                    self._playwright = await async_playwright().start()
                 self.browser = await self._playwright.chromium.launch(
                     headless=True,
                     args=[
@@ -28,6 +56,8 @@ class JobChecker:
                         "--window-size=1920x1080",
                     ],
                 )
+                self.browser.on("disconnected", self.governor.on_disconnected)
+                self.governor.start()
                 self.logger.info("👾 Launched headless browser")
             except Exception as e:
                 self.logger.error(f"Failed to initialize browser: {str(e)}")
@@ -37,166 +67,256 @@ class JobChecker:
                 raise RuntimeError(f"Browser initialization failed: {str(e)}")
         return self.browser
 
-    async def new_page(self) -> Page:
+    async def relaunch_browser(self):
+        """Swap in a fresh page pool and browser, keeping Playwright running."""
+        old_pool, self.pool = self.pool, PagePool(self.new_context, PAGE_POOL_SIZE, PAGE_POOL_MAX_USES)
+        await old_pool.close()
+        browser, self.browser = self.browser, None
+        if browser:
+            try:
+                await browser.close()
+            except Exception as e:
+                self.logger.error(f"Error closing browser: {str(e)}")
+        await self.init_browser()
+
+    async def new_context(self) -> BrowserContext:
+        """Create a browser context with request blocking and the asset cache installed once."""
         try:
             browser = await self.init_browser()
-            page = await browser.new_page()
-            await page.route(
-                "**/*",
-                lambda r: r.abort() if r.request.resource_type in ("image", "stylesheet", "font", "media") else r.continue_()
-            )
+            context = await browser.new_context()
+            await context.route("**/*", self.assets.handle)
             # Set longer timeout for navigation (10-15 seconds)
             random_timeout = int(random.uniform(10000, 15000))
-            page.set_default_navigation_timeout(random_timeout)
-            return page
+            context.set_default_navigation_timeout(random_timeout)
+            return context
         except Exception as e:
-            self.logger.error(f"Failed to create new page: {str(e)}")
-            raise RuntimeError(f"Failed to create new page: {str(e)}")
+            self.logger.error(f"Failed to create new browser context: {str(e)}")
+            raise RuntimeError(f"Failed to create new browser context: {str(e)}")
 
     async def _check_job_via_api(self, jid: str) -> dict:
         """Check job application type using LinkedIn API."""
         try:
             api = f"{LINKEDIN_JOB_POSTING_API}/{jid}"
-            async with aiohttp.ClientSession() as tmp:
-                async with tmp.get(api, timeout=10) as resp:
-                    text = await resp.text()
-                    if resp.status == 200 and "applyMethod" in text:
-                        return {
-                            "isEasyApply": "EASY_APPLY" in text,
-                            "hasCompanyWebsite": "EXTERNAL" in text,
-                            "companyWebsiteUrl": "",
-                        }
+            async with self.http.get(api, timeout=10) as resp:
+                text = await resp.text()
+                if resp.status == 200 and "applyMethod" in text:
+                    return {
+                        "isEasyApply": "EASY_APPLY" in text,
+                        "hasCompanyWebsite": "EXTERNAL" in text,
+                        "companyWebsiteUrl": "",
+                        "resolvedBy": "api",
+                    }
         except Exception as e:
             self.logger.debug(f"API fallback error: {str(e)}")
         return None
 
-    async def _get_apply_button_info(self, page: Page) -> dict:
-        """Get information about apply buttons on the page."""
+    async def _check_job_via_html(self, job_url: str) -> dict:
+        """Classify from the server-rendered job page; None when it is ambiguous."""
         try:
-            # Increased timeout for selector (5-8 seconds)
-            random_timeout = int(random.uniform(5000, 8000))
-            await page.wait_for_selector(
-                'button[data-tracking-control-name*="public_jobs_apply-link"]',
-                timeout=random_timeout,
-            )
-        except PlaywrightError as e:
-            self.logger.debug(f"Selector not found for apply link button: {str(e)}")
+            # Job pages share the LinkedIn host budget with the API
+            self.http.limit_host(job_url, LINKEDIN_API_RATE, LINKEDIN_API_BURST)
+            async with self.http.get(job_url, timeout=10) as resp:
+                if resp.status != 200:
+                    return None
+                text = await resp.text()
+        except Exception as e:
+            self.logger.debug(f"HTML fetch error: {str(e)}")
+            return None
 
-        try:
-            return await page.evaluate('''() => {
-                const onsite = !!document.querySelector(
-                    'button[data-tracking-control-name="public_jobs_apply-link-onsite"]'
-                );
-                const offsite = !!document.querySelector(
-                    'button[data-tracking-control-name="public_jobs_apply-link-offsite_sign-up-modal"]'
-                );
+        if 'data-tracking-control-name="public_jobs_apply-link-onsite"' in text:
+            return {
+                "isEasyApply": True,
+                "hasCompanyWebsite": False,
+                "companyWebsiteUrl": "",
+                "resolvedBy": "html",
+            }
+        if 'data-tracking-control-name="public_jobs_apply-link-offsite_sign-up-modal"' in text:
+            match = EXTERNAL_APPLY_URL.search(text)
+            if match:
+                company_url = clean_url(urljoin(job_url, html.unescape(match.group(2))))
+                if company_url and "linkedin.com" not in urlparse(company_url).netloc:
+                    return {
+                        "isEasyApply": False,
+                        "hasCompanyWebsite": True,
+                        "companyWebsiteUrl": company_url,
+                        "resolvedBy": "html",
+                    }
+        # No button, or an offsite button whose link is only in the modal
+        return None
+
+    async def _wait_for_apply_buttons(self, page: Page, until_loaded: bool, timeout: int) -> dict:
+        handle = await page.wait_for_function('''(untilLoaded) => {
+            const onsite = !!document.querySelector(
+                'button[data-tracking-control-name="public_jobs_apply-link-onsite"]'
+            );
+            const offsite = !!document.querySelector(
+                'button[data-tracking-control-name="public_jobs_apply-link-offsite_sign-up-modal"]'
+            );
+            if (onsite || offsite || (untilLoaded && document.readyState === 'complete')) {
                 return { isEasyApply: onsite, hasOffsiteButton: offsite };
-            }''')
-        except Exception as e:
-            self.logger.error(f"Error evaluating page content: {str(e)}")
-            return {"isEasyApply": False, "hasOffsiteButton": False}
+            }
+            return null;
+        }''', arg=until_loaded, timeout=timeout)
+        return await handle.json_value()
+
+    async def _get_apply_button_info(self, page: Page) -> dict:
+        """Get information about apply buttons on the page.
+
+        Resolves as soon as either apply button is rendered. Blocked images
+        and stylesheets let the load event fire early, so a page that has
+        finished loading still gets a short grace period for a late button.
+        A page that never renders one raises, so the job is retried rather
+        than guessed.
+        """
+        # Same 5-8 second ceiling as before, but only hit when the page hangs
+        random_timeout = int(random.uniform(5000, 8000))
+        info = await self._wait_for_apply_buttons(page, True, random_timeout)
+        if info["isEasyApply"] or info["hasOffsiteButton"]:
+            return info
+
+        # Loaded without a button: give scripts 2-3 more seconds to render one
+        grace_timeout = int(random.uniform(2000, 3000))
+        try:
+            return await self._wait_for_apply_buttons(page, False, grace_timeout)
+        except PlaywrightTimeoutError:
+            raise RuntimeError("Page loaded without an apply button")
+
+    async def _wait_for_modal_link(self, page: Page, timeout: int) -> str:
+        handle = await page.wait_for_function('''() => {
+            const direct = document.querySelector(
+                '.sign-up-modal__direct-apply-on-company-site a.sign-up-modal__company_webiste'
+            )?.href;
+            if (direct) return direct;
+            const modal = document.querySelector('div[role=dialog]');
+            if (!modal) return null;
+            const links = Array.from(modal.querySelectorAll('a'));
+            const pick = links.find(l => {
+                const t = l.textContent?.toLowerCase()||'';
+                const h = l.href||'';
+                return (t.includes('apply')||t.includes('application'))
+                    && !h.includes('linkedin.com') && h.startsWith('http');
+            });
+            return pick?.href||null;
+        }''', timeout=timeout)
+        return await handle.json_value()
+
+    async def _wait_for_external_apply_request(self, page: Page, timeout: int) -> str:
+        request = await page.wait_for_event(
+            "request",
+            predicate=lambda r: "externalApply" in r.url,
+            timeout=timeout,
+        )
+        return request.url
 
     async def _get_company_website_url(self, page: Page) -> str:
-        """Get company website URL from the dialog."""
+        """Get company website URL from the dialog.
+
+        Races the modal link appearing in the DOM against an ``externalApply``
+        request, whichever comes first.
+        """
+        # Increased timeout for dialog (5-8 seconds)
+        random_timeout = int(random.uniform(5000, 8000))
+        waiters = [
+            asyncio.create_task(self._wait_for_modal_link(page, random_timeout)),
+            asyncio.create_task(self._wait_for_external_apply_request(page, random_timeout)),
+        ]
         try:
             await page.click(
                 'button[data-tracking-control-name="public_jobs_apply-link-offsite_sign-up-modal"]',
                 force=True,
             )
-            try:
-                # Increased timeout for dialog (5-8 seconds)
-                random_timeout = int(random.uniform(5000, 8000))
-                await page.wait_for_selector("div[role=dialog]", timeout=random_timeout)
-            except PlaywrightError as e:
-                self.logger.debug(f"Dialog selector not found after clicking offsite button: {str(e)}")
-                return ""
-
-            # Wait for dialog to be fully loaded
-            await asyncio.sleep(2)
-
-            for _ in range(3):
-                try:
-                    href = await page.evaluate('''() => {
-                        const direct = document.querySelector(
-                            '.sign-up-modal__direct-apply-on-company-site a.sign-up-modal__company_webiste'
-                        )?.href;
-                        if (direct) return direct;
-                        const modal = document.querySelector('div[role=dialog]');
-                        if (!modal) return '';
-                        const links = Array.from(modal.querySelectorAll('a'));
-                        const pick = links.find(l => {
-                            const t = l.textContent?.toLowerCase()||'';
-                            const h = l.href||'';
-                            return (t.includes('apply')||t.includes('application'))
-                                && !h.includes('linkedin.com') && h.startsWith('http');
-                        });
-                        return pick?.href||'';
-                    }''')
-                    if href:
-                        return clean_url(href)
-                except Exception as e:
-                    self.logger.debug(f"Error extracting URL attempt {_ + 1}: {str(e)}")
-                await asyncio.sleep(2)
+            pending = set(waiters)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.exception() and task.result():
+                        return clean_url(task.result())
+            self.logger.debug("No company link found after clicking offsite button")
         except Exception as e:
             self.logger.error(f"Error getting company website URL: {str(e)}")
+        finally:
+            for task in waiters:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*waiters, return_exceptions=True)
         return ""
 
     async def check_job_application_type(self, job_url: str) -> dict:
-        """Check the type of job application (Easy Apply or Company Website)."""
+        """Check the type of job application (Easy Apply or Company Website).
+
+        Results are cached by LinkedIn job id and concurrent checks of the
+        same id are coalesced. Browser failures are raised, never cached.
+        """
         jid = extract_job_id(job_url)
-        
+        if not jid:
+            result = await self._classify(job_url, jid)
+        else:
+            result = await self.cache.get_or_check(
+                jid, lambda: self._classify(job_url, jid), cacheable=self._is_conclusive
+            )
+        # Counted per returned result, so cache hits and coalesced checks show up too
+        self.resolved[result["resolvedBy"]] += 1
+        CLASSIFICATIONS.labels(result["resolvedBy"]).inc()
+        return result
+
+    @staticmethod
+    def _is_conclusive(result: dict) -> bool:
+        """A browser result is only cached when it found Easy Apply or a company link"""
+        if result.get("resolvedBy") != "browser":
+            return True
+        return result["isEasyApply"] or bool(result["companyWebsiteUrl"])
+
+    async def _classify(self, job_url: str, jid: str) -> dict:
         # Try API first
         if jid:
             try:
-                api_result = await self._check_job_via_api(jid)
-                if api_result:
+                with time_stage("api_probe"):
+                    api_result = await self._check_job_via_api(jid)
+                # The API never carries the company link, so an EXTERNAL
+                # answer still has to be resolved from the page
+                if api_result and api_result["isEasyApply"]:
                     return api_result
             except Exception as e:
-                self.logger.debug(f"API check failed, falling back to browser: {str(e)}")
+                self.logger.debug(f"API check failed, falling back to HTML: {str(e)}")
+
+        # Then the server-rendered page, without a renderer process
+        with time_stage("html_fetch"):
+            html_result = await self._check_job_via_html(job_url)
+        if html_result:
+            return html_result
 
         # Fallback to browser-based check
-        page = None
-        try:
-            page = await self.new_page()
+        async with self.governor.session(), self.pool.page() as page:
             # Increased timeout for page load (10-15 seconds)
             random_timeout = int(random.uniform(10000, 15000))
-            await page.goto(job_url, wait_until="domcontentloaded", timeout=random_timeout)
-            await asyncio.sleep(2)  # Wait for dynamic content
+            with time_stage("goto"):
+                await page.goto(job_url, wait_until="domcontentloaded", timeout=random_timeout)
 
-            info = await self._get_apply_button_info(page)
+            with time_stage("button_detect"):
+                info = await self._get_apply_button_info(page)
             company_url = ""
-            
+
             if not info["isEasyApply"] and info["hasOffsiteButton"]:
-                company_url = await self._get_company_website_url(page)
+                with time_stage("modal_extract"):
+                    company_url = await self._get_company_website_url(page)
+                if not company_url:
+                    # An offsite job whose link could not be read is not Easy Apply;
+                    # raise so it is retried with backoff and never cached
+                    raise RuntimeError("Offsite apply button found but no company link was extracted")
 
             return {
                 "isEasyApply": info["isEasyApply"],
                 "hasCompanyWebsite": bool(company_url),
                 "companyWebsiteUrl": company_url,
+                "resolvedBy": "browser",
             }
 
-        except PlaywrightError as e:
-            self.logger.error(f"Browser error for {job_url}: {str(e)}")
-            return {
-                "isEasyApply": True,  # Default to Easy Apply on error
-                "hasCompanyWebsite": False,
-                "companyWebsiteUrl": ""
-            }
-        except Exception as e:
-            self.logger.error(f"Unexpected error checking {job_url}: {str(e)}")
-            return {
-                "isEasyApply": True,
-                "hasCompanyWebsite": False,
-                "companyWebsiteUrl": ""
-            }
-        finally:
-            if page:
-                try:
-                    await page.close()
-                except Exception as e:
-                    self.logger.error(f"Error closing page: {str(e)}")
-
     async def close(self):
+        await self.governor.close()
+        await self.pool.close()
+        self.cache.close()
+        self.assets.close()
+        self.logger.info(f"Jobs resolved by path: {dict(self.resolved)}")
         if self.browser:
             try:
                 await self.browser.close()
@@ -207,3 +327,5 @@ class JobChecker:
                 await self._playwright.stop()
             except Exception as e:
                 self.logger.error(f"Error stopping playwright: {str(e)}")
+        if self._owns_http:
+            await self.http.close()
@@ -0,0 +1,79 @@
+import os
+import socket
+import logging
+import asyncio
+from uuid import uuid4
+from datetime import datetime, timedelta, timezone
+from config.config import LEASE_SECONDS
+
+
+def lease_deadline(seconds: float = LEASE_SECONDS) -> datetime:
+    """Lease expiry truncated to the millisecond precision Mongo stores."""
+    until = datetime.now(timezone.utc) + timedelta(seconds=seconds)
+    return until.replace(microsecond=until.microsecond // 1000 * 1000)
+
+
+class LeaseKeeper:
+    """Renews the leases this instance holds on claimed rawJobs documents.
+
+    Claimed ids are renewed every third of the lease period until they are
+    released, so only documents held by a dead instance ever expire.
+    """
+
+    def __init__(self, raw_coll, owner: str = None, lease_seconds: float = LEASE_SECONDS):
+        self._coll = raw_coll
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self.lease_seconds = lease_seconds
+        self._held = set()
+        self._task = None
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._renew_periodically())
+
+    def hold(self, doc_ids):
+        self._held.update(doc_ids)
+
+    def release(self, doc_id) -> dict:
+        """Stop renewing ``doc_id`` and return the fields that clear its claim."""
+        self._held.discard(doc_id)
+        return {"claimedBy": None, "leaseUntil": None}
+
+    async def _renew_periodically(self):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await self.renew()
+            except Exception as e:
+                self.logger.error(f"Lease renewal failed: {str(e)}")
+
+    async def renew(self):
+        if not self._held:
+            return
+        result = await self._coll.update_many(
+            {"_id": {"$in": list(self._held)}, "claimedBy": self.owner},
+            {"$set": {"leaseUntil": lease_deadline(self.lease_seconds)}}
+        )
+        if result.matched_count < len(self._held):
+            self.logger.warning(f"Renewed {result.matched_count}/{len(self._held)} leases, some were lost")
+
+    async def close(self):
+        """Stop renewing and hand back any documents that were never processed."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._held:
+            try:
+                await self._coll.update_many(
+                    {"_id": {"$in": list(self._held)}, "claimedBy": self.owner},
+                    {"$set": {"claimedBy": None, "leaseUntil": None}}
+                )
+                self.logger.info(f"Released {len(self._held)} unprocessed leases")
+            except Exception as e:
+                self.logger.error(f"Failed to release leases: {str(e)}")
+            self._held.clear()
@@ -0,0 +1,94 @@
+import sys
+import queue
+import atexit
+import random
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from config.config import LOG_LEVEL, LOG_SAMPLE_RATE
+
+# Attributes every LogRecord has; anything else was passed via ``extra``
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+_listener = None
+
+
+def _quote(value) -> str:
+    text = str(value)
+    if not text or any(c in text for c in ' "=\n'):
+        text = '"' + text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+    return text
+
+
+class KeyValueFormatter(logging.Formatter):
+    """``ts=... level=... logger=... msg=...`` followed by the record's extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key != "sample" and value is not None:
+                fields[key] = value
+        if record.exc_info:
+            fields["exc"] = self.formatException(record.exc_info)
+        return " ".join(f"{key}={_quote(value)}" for key, value in fields.items())
+
+
+class SuccessSampler(logging.Filter):
+    """Keeps ``rate`` of the records logged with ``extra={"sample": True}``.
+
+    Only routine per-job lines are marked that way; warnings and errors are
+    always kept.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not getattr(record, "sample", False):
+            return True
+        return random.random() < self.rate
+
+
+class _LocalQueueHandler(QueueHandler):
+    """Hands records to the listener unformatted; formatting happens on its thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def configure_logging(level: str = LOG_LEVEL, sample_rate: float = LOG_SAMPLE_RATE):
+    """Route all logging through a queue so formatting and writes happen on
+    a listener thread instead of the event loop. Safe to call more than once."""
+    global _listener
+    if _listener is not None:
+        return
+
+    records = queue.SimpleQueue()
+    handler = _LocalQueueHandler(records)
+    handler.addFilter(SuccessSampler(sample_rate))
+
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(KeyValueFormatter())
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(records, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,164 @@
+import os
+import json
+import logging
+import asyncio
+from aiohttp import ClientError
+from services.metrics import time_stage
+from config.config import (
+    CREATE_API,
+    CREATE_BULK_API,
+    SINK_QUEUE_MAX,
+    SINK_SENDERS,
+    SINK_BATCH_SIZE,
+    SINK_MAX_RETRIES,
+    SINK_DRAIN_TIMEOUT,
+    SINK_SPOOL_DIR,
+)
+
+
+class MatureJobSink:
+    """Queues mature-job payloads and posts them to CREATE_API off the worker path.
+
+    Every payload is spooled to disk before it is queued and removed once the
+    API accepts (or permanently rejects) it, so anything still in flight
+    after a crash or a CREATE_API outage is replayed on the next start.
+    """
+
+    def __init__(self, http, spool_dir: str = SINK_SPOOL_DIR):
+        self._http = http
+        self._spool_dir = spool_dir
+        self._queue = asyncio.Queue(maxsize=SINK_QUEUE_MAX)
+        self._senders = []
+        self._bulk_supported = bool(CREATE_BULK_API)
+        self.sent = 0
+        self.rejected = 0
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def _spool_path(self, payload: dict) -> str:
+        return os.path.join(self._spool_dir, f"{payload['rawJob']}.json")
+
+    def _write_spool(self, payload: dict):
+        path = self._spool_path(payload)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(payload, f)
+        os.replace(tmp, path)
+
+    def _remove_spool(self, payload: dict):
+        try:
+            os.remove(self._spool_path(payload))
+        except FileNotFoundError:
+            pass
+
+    def _read_spool(self) -> list:
+        payloads = []
+        for name in sorted(os.listdir(self._spool_dir)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self._spool_dir, name)) as f:
+                    payloads.append(json.load(f))
+            except (OSError, ValueError) as e:
+                self.logger.error(f"Skipping unreadable spool file {name}: {str(e)}")
+        return payloads
+
+    async def start(self):
+        os.makedirs(self._spool_dir, exist_ok=True)
+        pending = await asyncio.to_thread(self._read_spool)
+        if pending:
+            self.logger.info(f"Replaying {len(pending)} spooled mature jobs")
+        for i in range(SINK_SENDERS):
+            self._senders.append(asyncio.create_task(self._sender(i)))
+        for payload in pending:
+            await self._queue.put(payload)
+
+    async def submit(self, payload: dict):
+        """Spool ``payload`` and queue it; waits only when the queue is full."""
+        await asyncio.to_thread(self._write_spool, payload)
+        await self._queue.put(payload)
+
+    async def _sender(self, sender_id: int):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < SINK_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                await self._send_with_retry(batch)
+            except Exception as e:
+                # A dead sender would eventually block every worker in submit();
+                # the batch stays spooled and is replayed on the next start
+                self.logger.error(f"Sender {sender_id} failed on {len(batch)} mature jobs: {str(e)}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _send_with_retry(self, batch: list):
+        for attempt in range(SINK_MAX_RETRIES + 1):
+            try:
+                with time_stage("create_api"):
+                    batch = await self._send(batch)
+            except (ClientError, asyncio.TimeoutError) as e:
+                self.logger.error(f"❌ HTTP error posting {len(batch)} mature jobs: {str(e)}")
+            if not batch:
+                return
+            if attempt < SINK_MAX_RETRIES:
+                await asyncio.sleep(min(2 ** attempt, 60))
+        self.logger.error(f"Leaving {len(batch)} mature jobs in spool after {SINK_MAX_RETRIES + 1} attempts")
+
+    async def _send(self, batch: list) -> list:
+        """Post ``batch`` and return the payloads that should be retried."""
+        if self._bulk_supported and len(batch) > 1:
+            async with self._http.post(CREATE_BULK_API, json=batch, timeout=30) as r:
+                if r.status in (200, 201):
+                    for payload in batch:
+                        await asyncio.to_thread(self._remove_spool, payload)
+                    self.sent += len(batch)
+                    self.logger.info(f"🚀 Created {len(batch)} mature jobs in bulk")
+                    return []
+                if r.status in (404, 405):
+                    self.logger.warning("CREATE_BULK_API not supported, falling back to single posts")
+                    self._bulk_supported = False
+                else:
+                    text = await r.text()
+                    self.logger.error(f"❌ Bulk API error {r.status}: {text}")
+                    return batch
+
+        retry = []
+        for payload in batch:
+            job_id = payload["rawJob"]
+            try:
+                async with self._http.post(CREATE_API, json=payload, timeout=30) as r:
+                    if r.status in (200, 201):
+                        self.sent += 1
+                        self.logger.info("Created mature job", extra={"job_id": job_id, "sample": True})
+                    elif r.status == 429 or r.status >= 500:
+                        text = await r.text()
+                        self.logger.error(f"❌ API error {r.status} for {job_id}: {text}")
+                        retry.append(payload)
+                        continue
+                    else:
+                        # Rejected payloads are not replayed
+                        self.rejected += 1
+                        text = await r.text()
+                        self.logger.error(f"❌ API error {r.status} for {job_id}: {text}")
+            except (ClientError, asyncio.TimeoutError) as e:
+                self.logger.error(f"❌ HTTP error creating mature job for {job_id}: {str(e)}")
+                retry.append(payload)
+                continue
+            await asyncio.to_thread(self._remove_spool, payload)
+        return retry
+
+    async def close(self):
+        """Drain the queue for up to SINK_DRAIN_TIMEOUT seconds, then stop senders."""
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=SINK_DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.logger.warning(f"Sink drain timed out, {self._queue.qsize()} mature jobs left in spool")
+        for task in self._senders:
+            task.cancel()
+        await asyncio.gather(*self._senders, return_exceptions=True)
+        self._senders = []
+        self.logger.info(f"Mature job sink closed: {self.sent} created, {self.rejected} rejected")
@@ -0,0 +1,128 @@
+import os
+# Loads .env first: prometheus_client picks its value store from
+# PROMETHEUS_MULTIPROC_DIR when it is imported
+from config.config import PROMETHEUS_MULTIPROC_DIR
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+)
+
+# Per-stage latency; stages: api_probe, html_fetch, page_acquire, goto,
+# button_detect, modal_extract, mongo_write, create_api
+STAGE_SECONDS = Histogram(
+    "mature_job_stage_seconds",
+    "Time spent in each stage of checking a job",
+    ["stage"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30),
+)
+
+CLASSIFICATIONS = Counter(
+    "mature_job_classifications_total",
+    "Jobs classified, by the path that resolved them",
+    ["path"],
+)
+
+JOBS = Counter(
+    "mature_job_jobs_total",
+    "Jobs processed, by outcome",
+    ["outcome"],
+)
+
+ASSET_REQUESTS = Counter(
+    "mature_job_asset_requests_total",
+    "Browser sub-requests handled by the asset cache, by result (hit, miss, blocked)",
+    ["result"],
+)
+ASSET_BYTES = Counter(
+    "mature_job_asset_bytes_total",
+    "Bytes of cacheable assets, by where they came from (network, cache)",
+    ["source"],
+)
+
+# Gauges are summed over live processes in multiprocess mode
+QUEUE_DEPTH = Gauge("mature_job_queue_depth", "Claimed jobs waiting for a worker", multiprocess_mode="livesum")
+
+BROWSER_RESTARTS = Counter(
+    "mature_job_browser_restarts_total",
+    "Chromium restarts, by reason (memory, pages, disconnected)",
+    ["reason"],
+)
+BROWSER_RSS = Gauge(
+    "mature_job_browser_rss_bytes", "Resident memory of the Chromium processes", multiprocess_mode="livesum"
+)
+
+WORKERS = Gauge("mature_job_workers", "Checker workers running", multiprocess_mode="livesum")
+WORKERS_BUSY = Gauge("mature_job_workers_busy", "Checker workers processing a job", multiprocess_mode="livesum")
+WORKERS_ACTIVE_LIMIT = Gauge(
+    "mature_job_workers_active_limit",
+    "Workers the concurrency controller lets take jobs",
+    multiprocess_mode="livesum",
+)
+
+_workers = {"running": 0, "busy": 0}
+
+# Set on every change rather than with set_function, which multiprocess mode
+# cannot export; one series per process there
+WORKER_BUSY_RATIO = Gauge(
+    "mature_job_worker_busy_ratio", "Share of running workers processing a job", multiprocess_mode="liveall"
+)
+
+
+def _update_busy_ratio():
+    WORKER_BUSY_RATIO.set(_workers["busy"] / _workers["running"] if _workers["running"] else 0.0)
+
+
+def time_stage(stage: str):
+    """Context manager observing the duration of ``stage``"""
+    return STAGE_SECONDS.labels(stage).time()
+
+
+def worker_started():
+    _workers["running"] += 1
+    WORKERS.inc()
+    _update_busy_ratio()
+
+
+def worker_stopped():
+    _workers["running"] -= 1
+    WORKERS.dec()
+    _update_busy_ratio()
+
+
+def job_started():
+    _workers["busy"] += 1
+    WORKERS_BUSY.inc()
+    _update_busy_ratio()
+
+
+def job_finished():
+    _workers["busy"] -= 1
+    WORKERS_BUSY.dec()
+    _update_busy_ratio()
+
+
+def registry():
+    """Registry to export: this process, or every process writing to
+    PROMETHEUS_MULTIPROC_DIR"""
+    if not PROMETHEUS_MULTIPROC_DIR:
+        return REGISTRY
+    collected = CollectorRegistry()
+    multiprocess.MultiProcessCollector(collected)
+    return collected
+
+
+def process_exited():
+    """Drop this process's live gauges; counters and histograms are kept"""
+    if PROMETHEUS_MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def render():
+    """Current metrics in Prometheus text format and their content type"""
+    return generate_latest(registry()), CONTENT_TYPE_LATEST
@@ -0,0 +1,108 @@
+import logging
+import asyncio
+from contextlib import asynccontextmanager
+from playwright.async_api import BrowserContext, Page
+from services.metrics import time_stage
+
+
+class PageSlot:
+    """A warm browser context with a single page, reused across jobs."""
+
+    def __init__(self, context: BrowserContext, page: Page):
+        self.context = context
+        self.page = page
+        self.uses = 0
+        self.broken = False
+
+
+class PagePool:
+    """Bounded pool of reusable browser contexts/pages.
+
+    Slots are created lazily up to ``size`` and recycled after ``max_uses``
+    jobs. ``context_factory`` must return a ready-to-use ``BrowserContext``
+    (route handlers installed, timeouts set).
+    """
+
+    def __init__(self, context_factory, size: int, max_uses: int):
+        self._context_factory = context_factory
+        self._size = max(1, size)
+        self._max_uses = max(1, max_uses)
+        self._idle = asyncio.LifoQueue()
+        self._slots = asyncio.Semaphore(self._size)
+        self._closed = False
+        self.created = 0
+        self.recycled = 0
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    async def _create_slot(self) -> PageSlot:
+        context = await self._context_factory()
+        try:
+            page = await context.new_page()
+        except Exception:
+            await context.close()
+            raise
+        self.created += 1
+        return PageSlot(context, page)
+
+    async def _close_slot(self, slot: PageSlot):
+        try:
+            await slot.context.close()
+        except Exception as e:
+            self.logger.debug(f"Error closing browser context: {str(e)}")
+
+    async def _reset_slot(self, slot: PageSlot):
+        """Clear cookies and storage and park the page on about:blank."""
+        try:
+            await slot.page.evaluate('''() => {
+                try { window.localStorage.clear(); } catch (e) {}
+                try { window.sessionStorage.clear(); } catch (e) {}
+            }''')
+        except Exception:
+            pass
+        await slot.context.clear_cookies()
+        await slot.page.goto("about:blank")
+
+    @asynccontextmanager
+    async def page(self):
+        """Borrow a page for the duration of one job."""
+        if self._closed:
+            raise RuntimeError("Page pool is closed")
+
+        await self._slots.acquire()
+        slot = None
+        try:
+            with time_stage("page_acquire"):
+                try:
+                    slot = self._idle.get_nowait()
+                except asyncio.QueueEmpty:
+                    slot = await self._create_slot()
+
+            slot.uses += 1
+            try:
+                yield slot.page
+            except BaseException:
+                slot.broken = slot.page.is_closed()
+                raise
+        finally:
+            if slot:
+                await self._release(slot)
+            self._slots.release()
+
+    async def _release(self, slot: PageSlot):
+        if self._closed or slot.broken or slot.page.is_closed() or slot.uses >= self._max_uses:
+            if slot.uses >= self._max_uses:
+                self.recycled += 1
+            await self._close_slot(slot)
+            return
+        try:
+            await self._reset_slot(slot)
+        except Exception as e:
+            self.logger.debug(f"Failed to reset page, discarding slot: {str(e)}")
+            await self._close_slot(slot)
+            return
+        self._idle.put_nowait(slot)
+
+    async def close(self):
+        self._closed = True
+        while not self._idle.empty():
+            await self._close_slot(self._idle.get_nowait())
@@ -0,0 +1,31 @@
+import random
+from datetime import datetime, timedelta, timezone
+from config.config import RETRY_MAX_ATTEMPTS, RETRY_BASE_SECONDS, RETRY_MAX_SECONDS
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Exponential backoff for the given attempt number, plus up to 25% jitter."""
+    delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** max(0, attempts - 1))
+    return delay + random.uniform(0, delay * 0.25)
+
+
+def failure_fields(doc: dict, error: str, permanent: bool = False) -> dict:
+    """Fields recording a failed attempt on ``doc``.
+
+    The job is scheduled for another attempt after ``backoff_seconds``, or
+    dead-lettered once RETRY_MAX_ATTEMPTS is reached or the failure is
+    ``permanent``.
+    """
+    attempts = doc.get("attempts", 0) + 1
+    now = datetime.now(timezone.utc)
+    fields = {
+        "attempts": attempts,
+        "lastError": error[:500],
+        "updatedAt": now,
+    }
+    if permanent or attempts >= RETRY_MAX_ATTEMPTS:
+        fields["isDeadLetter"] = True
+        fields["nextAttemptAt"] = None
+    else:
+        fields["nextAttemptAt"] = now + timedelta(seconds=backoff_seconds(attempts))
+    return fields
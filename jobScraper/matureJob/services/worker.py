@@ -1,33 +1,65 @@
+import time
 import logging
 import asyncio
 from datetime import datetime, timezone
-from aiohttp import ClientSession, ClientError
-from config.config import CREATE_API
+from services import metrics
+from services.retry import failure_fields
 
-async def worker(worker_id, queue, checker, raw_coll, http):
+async def worker(worker_id, queue, checker, writer, sink, lease, progress, controller):
     """Worker function to process jobs from queue"""
     logger = logging.getLogger(f"worker-{worker_id}")
+    metrics.worker_started()
     
+    try:
+        await _work(worker_id, queue, checker, writer, sink, lease, progress, controller, logger)
+    finally:
+        metrics.worker_stopped()
+
+async def _work(worker_id, queue, checker, writer, sink, lease, progress, controller, logger):
     while True:
         try:
+            # Idle while the controller holds this worker above its limit
+            await controller.wait_turn(worker_id)
+
             # Get job from queue
             doc = await queue.get()
+            metrics.QUEUE_DEPTH.set(queue.qsize())
             job_id = doc.get("_id")
             url = doc.get("jobUrl", "")
             
             if not url:
-                logger.error(f"No jobUrl found for document {job_id}")
-                queue.task_done()
+                logger.error("No jobUrl found", extra={"job_id": job_id})
+                try:
+                    # Retrying cannot fix a missing URL
+                    await writer.update(job_id, {
+                        **failure_fields(doc, "missing jobUrl", permanent=True),
+                        **lease.release(job_id)
+                    })
+                    metrics.JOBS.labels("dead_letter").inc()
+                except Exception as e:
+                    logger.error(f"Failed to dead-letter job: {str(e)}", extra={"job_id": job_id})
+                finally:
+                    progress.advance()
+                    queue.task_done()
                 continue
                 
+            metrics.job_started()
+            started = time.monotonic()
+            ok = False
             try:
-                logger.info(f"Processing job {job_id}: {url}")
+                logger.debug("Processing job", extra={"job_id": job_id, "url": url})
                 # Check job application type
                 res = await checker.check_job_application_type(url)
                 now = datetime.now(timezone.utc)
+                log_fields = {
+                    "job_id": job_id,
+                    "stage": res.get("resolvedBy"),
+                    "duration_ms": round((time.monotonic() - started) * 1000),
+                    "sample": True,
+                }
                 
                 if res["hasCompanyWebsite"] and res["companyWebsiteUrl"]:
-                    logger.info(f"Found external URL for {job_id}: {res['companyWebsiteUrl']}")
+                    logger.info("Mature job", extra={**log_fields, "url": res["companyWebsiteUrl"]})
                     flags = {
                         "isEasyApply": False,
                         "isMatureJob": True,
@@ -44,56 +76,49 @@ async def worker(worker_id, queue, checker, raw_coll, http):
                         "isRelevant": True,
                         "appliedBy": []
                     }
-                    try:
-                        async with http.post(CREATE_API, json=payload, timeout=30) as r:
-                            if r.status in (200, 201):
-                                logger.info(f"🚀 Created mature job for {job_id}")
-                            else:
-                                text = await r.text()
-                                logger.error(f"❌ API error {r.status} for {job_id}: {text}")
-                    except ClientError as e:
-                        logger.error(f"❌ HTTP error creating mature job for {job_id}: {str(e)}")
-                    except asyncio.TimeoutError:
-                        logger.error(f"❌ Timeout creating mature job for {job_id}")
-                    except Exception as e:
-                        logger.error(f"❌ Unexpected error creating mature job for {job_id}: {str(e)}")
+                    # Hand off to the sink so the worker never waits on CREATE_API
+                    await sink.submit(payload)
+                    metrics.JOBS.labels("mature").inc()
                 else:
                     # Everything else is treated as easy apply
-                    logger.info(f"Easy Apply job {job_id}: {url}")
+                    logger.info("Easy Apply job", extra=log_fields)
                     flags = {
                         "isEasyApply": True,
                         "isMatureJob": False,
                         "linkPassed": False,
                         "updatedAt": now
                     }
+                    metrics.JOBS.labels("easy_apply").inc()
                 
-                # Update the document with the determined flags
+                # Queue the flag update for the next bulk flush
                 try:
-                    await raw_coll.update_one(
-                        {"_id": job_id},
-                        {"$set": flags}
-                    )
-                    logger.info(f"Updated job {job_id} with flags: {flags}")
+                    await writer.update(job_id, {**flags, **lease.release(job_id)})
                 except Exception as e:
-                    logger.error(f"Failed to update job {job_id}: {str(e)}")
+                    logger.error(f"Failed to update job: {str(e)}", extra={"job_id": job_id})
+                ok = True
                 
             except Exception as e:
-                logger.error(f"Error processing job {job_id}: {str(e)}")
-                # Update the job as Easy Apply on error to prevent retries
+                logger.error(f"Error processing job: {str(e)}", extra={
+                    "job_id": job_id, "duration_ms": round((time.monotonic() - started) * 1000)
+                })
+                # Schedule a retry with backoff, or dead-letter after the last attempt
                 try:
-                    await raw_coll.update_one(
-                        {"_id": job_id},
-                        {"$set": {
-                            "isEasyApply": True,
-                            "isMatureJob": False,
-                            "linkPassed": False,
-                            "updatedAt": datetime.now(timezone.utc)
-                        }}
-                    )
-                    logger.info(f"Marked job {job_id} as Easy Apply due to error")
+                    fields = failure_fields(doc, str(e) or e.__class__.__name__)
+                    await writer.update(job_id, {**fields, **lease.release(job_id)})
+                    if fields.get("isDeadLetter"):
+                        metrics.JOBS.labels("dead_letter").inc()
+                        logger.warning("Dead-lettered job", extra={"job_id": job_id, "attempts": fields["attempts"]})
+                    else:
+                        metrics.JOBS.labels("retry").inc()
+                        logger.warning("Retrying job", extra={
+                            "job_id": job_id, "attempts": fields["attempts"], "retry_at": fields["nextAttemptAt"].isoformat()
+                        })
                 except Exception as update_error:
-                    logger.error(f"Failed to update job {job_id} after error: {str(update_error)}")
+                    logger.error(f"Failed to update job after error: {str(update_error)}", extra={"job_id": job_id})
             finally:
+                controller.record(time.monotonic() - started, ok)
+                metrics.job_finished()
+                progress.advance()
                 queue.task_done()
                 
         except asyncio.CancelledError: